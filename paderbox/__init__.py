@@ -1,19 +1,5 @@
-from numpy.fft import __file__ as FFT_FILE
-
-# https://github.com/numpy/numpy/issues/11456
-# https://github.com/ContinuumIO/anaconda-issues/issues/9697
-# https://github.com/IntelPython/mkl_fft/issues/11
-# Still there (22.2.19) https://github.com/IntelPython/mkl_fft/issues/24
-# Estimated that mkl=2019.3 is required (in the moment 2019.1)
-# $ conda env export --name=base | grep mkl
-# mkl=2019.1=144
-with open(FFT_FILE) as f:
-    if 'patch_fft = True' in f.read():
-        raise Exception(
-            'Your Numpy version uses MKL-FFT. That version causes '
-            f'segmentation faults. To fix it, open {FFT_FILE} and edit '
-            'it such that `patch_fft = True` becomes `patch_fft = False`.'
-        )
+# The check for the broken MKL-FFT of numpy is done in
+# paderbox.transform.module_fft, when the numpy FFT backend is used.
 
 __all__ = [
     'array',
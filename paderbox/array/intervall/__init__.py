@@ -13,6 +13,7 @@ of a long audio file (> 2h) in memory.
 """
 from .core import zeros
 from .core import ArrayIntervall
+from .core import overlap_count
 
 from .rttm import from_rttm
 from .rttm import from_rttm_str
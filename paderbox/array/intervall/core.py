@@ -7,12 +7,21 @@ activity information for large time streams.
 from pathlib import Path
 import collections
 import numpy as np
-from paderbox.array.intervall.util import (
-    cy_non_intersection,
-    cy_intersection,
-    cy_parse_item,
-    cy_str_to_intervalls,
-)
+try:
+    from paderbox.array.intervall.util import (
+        cy_intersection,
+        cy_non_intersection,
+        cy_parse_item,
+        cy_str_to_intervalls,
+    )
+except ImportError:
+    # The Cython extension is not compiled (e.g. a plain source checkout).
+    from paderbox.array.intervall.util_numpy import (
+        cy_intersection,
+        cy_non_intersection,
+        cy_parse_item,
+        cy_str_to_intervalls,
+    )
 
 
 def ArrayIntervall_from_str(string, shape):
@@ -98,9 +107,34 @@ def zeros(shape=None):
         shape = tuple(shape)
 
     ai.shape = shape
+    ai._init_intervals()
     return ai
 
 
+def _mask_to_intervals(mask):
+    """
+    Finds the intervals of True values in each row of a boolean (K, T) mask.
+
+    Returns:
+        The row index of each interval and the (N, 2) array with the start
+        and stop index of each interval, both sorted by row and start.
+
+    >>> index, intervals = _mask_to_intervals(np.array([[0, 1, 1], [1, 0, 1]]))
+    >>> index
+    array([0, 1, 1])
+    >>> intervals
+    array([[1, 3],
+           [0, 1],
+           [2, 3]])
+    """
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    diff = np.diff(padded, axis=-1)
+    index, starts = np.nonzero(diff > 0)
+    _, stops = np.nonzero(diff < 0)
+    return index, np.stack([starts, stops], axis=-1).astype(np.int64)
+
+
 class ArrayIntervall:
     from_str = staticmethod(ArrayIntervall_from_str)
 
@@ -125,21 +159,63 @@ class ArrayIntervall:
         assert array.ndim == 1, (array.ndim, array)
         assert array.dtype == np.bool, (np.bool, array)
 
-        diff = np.diff(array.astype(np.int32))
+        self.shape = array.shape
+        self._init_intervals()
+        self._set_normalized(_mask_to_intervals(array[None])[1])
 
-        rising = list(np.atleast_1d(np.squeeze(np.where(diff > 0), axis=0)) + 1)
-        falling = list(np.atleast_1d(np.squeeze(np.where(diff < 0), axis=0)) + 1)
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Converts boolean masks to ArrayIntervall objects in one vectorized
+        step.
 
-        if array[0] == 1:
-            rising = [0] + rising
+        Args:
+            mask: Boolean array with shape (T,) or (K, T).
 
-        if array[-1] == 1:
-            falling = falling + [len(array)]
+        Returns:
+            ArrayIntervall for a mask with shape (T,), otherwise a list with
+            K ArrayIntervall objects.
 
-        # ai = ArrayIntervall(shape=array.shape)
-        self.shape = array.shape
-        for start, stop in zip(rising, falling):
-            self[start:stop] = 1
+        >>> ArrayIntervall.from_mask([[0, 1, 1, 0], [1, 0, 0, 1]])
+        [ArrayIntervall("1:3", shape=(4,)), ArrayIntervall("0:1, 3:4", shape=(4,))]
+        """
+        mask = np.asarray(mask)
+        assert mask.ndim in [1, 2], (mask.ndim, mask.shape)
+        if mask.ndim == 1:
+            return cls(mask.astype(bool, copy=False))
+
+        if len(mask) == 0:
+            return []
+        index, intervals = _mask_to_intervals(mask.astype(bool, copy=False))
+        boundaries = np.searchsorted(index, np.arange(1, len(mask)))
+        ais = []
+        for row in np.split(intervals, boundaries):
+            ai = zeros(mask.shape[-1])
+            ai._set_normalized(row)
+            ais.append(ai)
+        return ais
+
+    @classmethod
+    def from_edges(cls, starts, stops, shape=None):
+        """
+        Constructs an ArrayIntervall from the start and stop indices of the
+        intervals. The intervals may be unsorted and may overlap.
+
+        Args:
+            starts: Start indices.
+            stops: Stop indices (exclusive).
+            shape: None, int or tuple/list that contains one int.
+
+        >>> ArrayIntervall.from_edges([10, 0, 5], [20, 3, 12], shape=30)
+        ArrayIntervall("0:3, 5:20", shape=(30,))
+        """
+        intervals = np.stack([
+            np.asarray(starts, dtype=np.int64),
+            np.asarray(stops, dtype=np.int64),
+        ], axis=-1).reshape(-1, 2)
+        ai = zeros(shape)
+        ai.add_intervals(intervals)
+        return ai
 
     def __array__(self, dtype=np.bool):
         """
@@ -185,79 +261,140 @@ class ArrayIntervall:
         """
         return self.from_str, (self._intervals_as_str, self.shape[-1])
 
-    _intervals_normalized = True
-    # _normalized_intervals = ()
-    _intervals = ()
+    def _init_intervals(self):
+        # The intervals are stored as normalized (i.e. sorted, not
+        # overlapping and not touching) (N, 2) int64 array. New intervals
+        # are collected in the pending lists and merged in one vectorized
+        # normalization, when the intervals are read.
+        self._array = np.zeros((0, 2), dtype=np.int64)
+        self._pending_tuples = []
+        self._pending_arrays = []
+        self._intervals_tuple = ()
 
     def __len__(self):
         return self.shape[0]
 
+    def _set_normalized(self, intervals):
+        """Replaces all intervals with an already normalized array."""
+        self._init_intervals()
+        self._array = intervals
+        self._array.setflags(write=False)
+        self._intervals_tuple = None
+
+    def _add(self, intervals):
+        """Adds an (N, 2) array of intervals without normalization."""
+        self._pending_arrays.append(intervals)
+        self._intervals_tuple = None
+
+    @property
+    def normalized_array(self):
+        """
+        The normalized intervals as read-only (N, 2) int64 array.
+
+        >>> ai = zeros(50)
+        >>> ai[10:15] = 1
+        >>> ai[0:10] = 1
+        >>> ai.normalized_array
+        array([[ 0, 15]])
+        """
+        if self._pending_tuples or self._pending_arrays:
+            intervals = [self._array] + self._pending_arrays
+            if self._pending_tuples:
+                intervals.append(np.array(
+                    self._pending_tuples, dtype=np.int64).reshape(-1, 2))
+            self._array = self._normalize(np.concatenate(intervals))
+            self._array.setflags(write=False)
+            self._pending_tuples = []
+            self._pending_arrays = []
+        return self._array
+
     @property
     def normalized_intervals(self):
-        if not self._intervals_normalized:
-            self._intervals = self._normalize(self._intervals)
-            self._intervals_normalized = True
-        return self._intervals
+        if self._intervals_tuple is None:
+            self._intervals_tuple = tuple(
+                map(tuple, self.normalized_array.tolist()))
+        return self._intervals_tuple
 
     @property
     def intervals(self):
-        return self._intervals
+        return self.normalized_intervals
 
     @intervals.setter
     def intervals(self, item):
-        self._intervals_normalized = False
-        self._intervals = tuple(item)
+        if isinstance(item, np.ndarray):
+            item = item.astype(np.int64).reshape(-1, 2)
+        else:
+            item = np.array(list(item), dtype=np.int64).reshape(-1, 2)
+        self._init_intervals()
+        self._add(item)
 
     @staticmethod
     def _normalize(intervals):
         """
-        >>> ArrayIntervall._normalize([])
-        ()
-        >>> ArrayIntervall._normalize([(0, 1)])
-        ((0, 1),)
-        >>> ArrayIntervall._normalize([(0, 1), (2, 3)])
-        ((0, 1), (2, 3))
-        >>> ArrayIntervall._normalize([(0, 1), (20, 30)])
-        ((0, 1), (20, 30))
-        >>> ArrayIntervall._normalize([(0, 1), (1, 3)])
-        ((0, 3),)
-        >>> ArrayIntervall._normalize([(0, 1), (1, 3), (3, 10)])
-        ((0, 10),)
-        """
-        intervals = [(s, e) for s, e in sorted(intervals) if s < e]
-        for i in range(len(intervals)):
-            try:
-                s, e = intervals[i]
-            except IndexError:
-                break
-            try:
-                next_s, next_e = intervals[i+1]
-                while next_s <= e:
-                    e = max(e, next_e)
-                    del intervals[i+1]
-                    next_s, next_e = intervals[i+1]
-            except IndexError:
-                pass
-            finally:
-                intervals[i] = (s, e)
-        return tuple(intervals)
+        Sorts the intervals and merges overlapping and touching intervals.
+
+        >>> ArrayIntervall._normalize([]).tolist()
+        []
+        >>> ArrayIntervall._normalize([(0, 1)]).tolist()
+        [[0, 1]]
+        >>> ArrayIntervall._normalize([(0, 1), (2, 3)]).tolist()
+        [[0, 1], [2, 3]]
+        >>> ArrayIntervall._normalize([(0, 1), (20, 30)]).tolist()
+        [[0, 1], [20, 30]]
+        >>> ArrayIntervall._normalize([(0, 1), (1, 3)]).tolist()
+        [[0, 3]]
+        >>> ArrayIntervall._normalize([(0, 1), (1, 3), (3, 10)]).tolist()
+        [[0, 10]]
+        >>> ArrayIntervall._normalize([(3, 10), (0, 5), (4, 4), (1, 2)])
+        array([[ 0, 10]])
+        """
+        intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+        intervals = intervals[intervals[:, 0] < intervals[:, 1]]
+        if len(intervals) == 0:
+            return intervals
+        intervals = intervals[np.argsort(intervals[:, 0], kind='stable')]
+        starts = intervals[:, 0]
+        # The end of the merged interval, that contains interval i.
+        ends = np.maximum.accumulate(intervals[:, 1])
+        # A new interval begins, when the start is behind all previous ends.
+        new = np.ones(len(intervals), dtype=bool)
+        new[1:] = starts[1:] > ends[:-1]
+        last = np.ones(len(intervals), dtype=bool)
+        last[:-1] = new[1:]
+        return np.stack([starts[new], ends[last]], axis=1)
+
+    def _intersection(self, start, stop):
+        """The normalized intervals clipped to [start, stop)."""
+        intervals = self.normalized_array
+        begin = np.searchsorted(intervals[:, 1], start, side='right')
+        end = np.searchsorted(intervals[:, 0], stop, side='left')
+        return cy_intersection((start, stop), intervals[begin:end])
+
+    def _non_intersection(self, start, stop):
+        """The normalized intervals without [start, stop)."""
+        intervals = self.normalized_array
+        if start >= stop:
+            return intervals
+        begin = np.searchsorted(intervals[:, 1], start, side='right')
+        end = np.searchsorted(intervals[:, 0], stop, side='left')
+        return np.concatenate([
+            intervals[:begin],
+            cy_non_intersection((start, stop), intervals[begin:end]),
+            intervals[end:],
+        ])
 
     @property
     def _intervals_as_str(self):
-        i_str = []
-        for i in self.normalized_intervals:
-            start, end = i
-            #             i_str += [f'[{start}, {end})']
-            i_str += [f'{start}:{end}']
-
-        i_str = ', '.join(i_str)
-        return i_str
+        return ', '.join([
+            f'{start}:{end}'
+            for start, end in self.normalized_array.tolist()
+        ])
 
     def __repr__(self):
         return f'{self.__class__.__name__}("{self._intervals_as_str}", shape={self.shape})'
 
     def add_intervals_from_str(self, string_intervals):
-        self.intervals = self.intervals + cy_str_to_intervalls(string_intervals)
+        self._add(cy_str_to_intervalls(string_intervals))
 
     def add_intervals(self, intervals):
         """
@@ -265,11 +402,28 @@ class ArrayIntervall:
             self[item] = 1
 
         # This function is equal to above example code, but significant faster.
+
+        intervals may also be an (N, 2) array with start and stop values.
+
+        >>> ai = zeros(50)
+        >>> ai.add_intervals([slice(1, 3), slice(2, 5)])
+        >>> ai.add_intervals(np.array([[10, 20], [40, 50]]))
+        >>> ai
+        ArrayIntervall("1:5, 10:20, 40:50", shape=(50,))
         """
-        # Short circuit
-        self.intervals = self.intervals + tuple(
-            [cy_parse_item(i, self.shape) for i in intervals]
-        )
+        if isinstance(intervals, np.ndarray):
+            intervals = intervals.astype(np.int64).reshape(-1, 2)
+            assert np.all(intervals >= 0), intervals
+            if self.shape is not None:
+                assert np.all(intervals <= self.shape[-1]), (
+                    intervals, self.shape)
+            self._add(intervals)
+        else:
+            # Short circuit
+            self._pending_tuples.extend(
+                [cy_parse_item(i, self.shape) for i in intervals]
+            )
+            self._intervals_tuple = None
 
     def __setitem__(self, item, value):
         """
@@ -317,17 +471,17 @@ class ArrayIntervall:
 
         if np.isscalar(value):
             if value == 1:
-                self.intervals = self.intervals + ((start, stop),)
+                self._pending_tuples.append((start, stop))
+                self._intervals_tuple = None
             elif value == 0:
-                self.intervals = cy_non_intersection((start, stop), self.intervals)
+                self._set_normalized(self._non_intersection(start, stop))
             else:
                 raise ValueError(value)
         elif isinstance(value, (tuple, list, np.ndarray)):
             assert len(value) == stop - start, (start, stop, len(value), value)
             ai = ArrayIntervall(value)
-            intervals = self.intervals
-            intervals = cy_non_intersection((start, stop), intervals)
-            self.intervals = intervals + tuple([(s+start, e+start) for s, e in ai.intervals])
+            self._set_normalized(self._non_intersection(start, stop))
+            self._add(ai.normalized_array + start)
         else:
             raise NotImplementedError(value)
 
@@ -344,16 +498,123 @@ class ArrayIntervall:
         >>> ai[19:26]
         array([ True, False, False, False, False, False,  True])
 
-        """
-        start, stop = cy_parse_item(item, self.shape)
-        intervals = cy_intersection((start, stop), self.normalized_intervals)
+        Integer and boolean index arrays (fancy indexing):
 
-        arr = np.zeros(stop - start, dtype=np.bool)
-
-        for i_start, i_end in intervals:
-            arr[i_start - start:i_end - start] = True
+        >>> ai[[5, 10, 29, -1]]
+        array([False,  True,  True, False])
+        >>> ai[25]
+        True
+        >>> ai[np.arange(50) % 5 == 0]
+        array([False, False,  True,  True, False,  True, False, False, False,
+               False])
 
-        return arr
+        """
+        if isinstance(item, slice):
+            start, stop = cy_parse_item(item, self.shape)
+            intervals = self._intersection(start, stop) - start
+
+            # The normalized intervals do not touch, hence each index is at
+            # most once a start or an end.
+            change = np.zeros(stop - start + 1, dtype=np.int8)
+            change[intervals[:, 0]] = 1
+            change[intervals[:, 1]] = -1
+            return np.cumsum(change[:-1], dtype=np.int8).astype(bool)
+
+        index = np.asarray(item)
+        if index.dtype == bool:
+            assert self.shape is not None and index.shape == self.shape, (
+                index.shape, self.shape)
+            index = np.flatnonzero(index)
+        elif np.issubdtype(index.dtype, np.integer):
+            if self.shape is None:
+                lower, upper = 0, np.inf
+            else:
+                lower, upper = -self.shape[-1], self.shape[-1]
+            if index.size and (
+                    np.min(index) < lower or np.max(index) >= upper
+            ):
+                raise IndexError(
+                    f'Index out of bounds for an {self.__class__.__name__} '
+                    f'with shape {self.shape}:\n{item}'
+                )
+            if self.shape is not None:
+                index = np.where(index < 0, index + self.shape[-1], index)
+        else:
+            raise IndexError(
+                f'Only slices, integers and integer or boolean arrays are '
+                f'valid indices for an {self.__class__.__name__}, '
+                f'not {item!r}.'
+            )
+        value = _contains(self.normalized_array, index)
+        if value.ndim == 0:
+            return bool(value)
+        return value
+
+    def _active_before(self, index):
+        """Number of True values before index, for an array of indices."""
+        intervals = self.normalized_array
+        if len(intervals) == 0:
+            return np.zeros(np.shape(index), dtype=np.int64)
+        lengths = intervals[:, 1] - intervals[:, 0]
+        cumulated = np.concatenate([[0], np.cumsum(lengths)])
+        # The last interval, that starts before index.
+        candidate = np.searchsorted(intervals[:, 0], index, side='left') - 1
+        valid = np.maximum(candidate, 0)
+        partial = np.minimum(index - intervals[valid, 0], lengths[valid])
+        return np.where(candidate >= 0, cumulated[valid] + partial, 0)
+
+    def query_ranges(self, starts, stops, output='coverage'):
+        """
+        Queries many ranges [start, stop) at once. Each range needs only a
+        binary search over the normalized intervals.
+
+        Args:
+            starts: Start indices of the ranges.
+            stops: Stop indices (exclusive) of the ranges.
+            output:
+                'coverage': The fraction of active samples of each range.
+                'count': The number of active samples of each range.
+                'mask': Boolean array with shape (ranges, length), where
+                    all ranges must have the same length (e.g. windows).
+
+        >>> ai = ArrayIntervall.from_str('10:20, 25:30', shape=50)
+        >>> ai.query_ranges([0, 15, 20], [10, 25, 30])
+        array([0. , 0.5, 0.5])
+        >>> ai.query_ranges([0, 15, 20], [10, 25, 30], output='count')
+        array([0, 5, 5])
+        >>> ai.query_ranges([8, 18, 28], [12, 22, 32], output='mask')
+        array([[False, False,  True,  True],
+               [ True,  True, False, False],
+               [ True,  True, False, False]])
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+        assert starts.shape == stops.shape, (starts.shape, stops.shape)
+        assert np.all(starts <= stops), (starts, stops)
+
+        if output == 'mask':
+            lengths = np.unique(stops - starts)
+            assert len(lengths) <= 1, (
+                'All ranges must have the same length for output="mask".',
+                lengths,
+            )
+            length = lengths[0] if len(lengths) else 0
+            return _contains(
+                self.normalized_array,
+                starts[..., None] + np.arange(length),
+            )
+
+        count = self._active_before(stops) - self._active_before(starts)
+        if output == 'count':
+            return count
+        elif output == 'coverage':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return count / (stops - starts)
+        else:
+            raise ValueError(
+                f'Unknown output {output!r}. '
+                f'Choose from "coverage", "count" or "mask".'
+            )
 
     def __or__(self, other):
         if not isinstance(other, ArrayIntervall):
@@ -361,5 +622,144 @@ class ArrayIntervall:
         else:
             assert other.shape == self.shape, (self.shape, other.shape)
             ai = zeros(shape=self.shape)
-            ai.intervals = self.intervals + other.intervals
+            ai._add(self.normalized_array)
+            ai._add(other.normalized_array)
             return ai
+
+    def _combine(self, other, operator):
+        """
+        Applies a boolean operator to self and other. The result is
+        constant between the edges of both, hence it is enough to evaluate
+        the operator once for each segment between two consecutive edges.
+        """
+        if not isinstance(other, ArrayIntervall):
+            return NotImplemented
+        assert other.shape == self.shape, (self.shape, other.shape)
+        a = self.normalized_array
+        b = other.normalized_array
+        edges = np.unique(np.concatenate([a.ravel(), b.ravel()]))
+        value = operator(
+            _contains(a, edges[:-1]), _contains(b, edges[:-1]))
+        ai = zeros(shape=self.shape)
+        ai._add(np.stack([edges[:-1][value], edges[1:][value]], axis=-1))
+        return ai
+
+    def __and__(self, other):
+        """
+        >>> a = ArrayIntervall.from_str('0:10, 20:30', shape=50)
+        >>> b = ArrayIntervall.from_str('5:25, 40:50', shape=50)
+        >>> a & b
+        ArrayIntervall("5:10, 20:25", shape=(50,))
+        """
+        return self._combine(other, np.logical_and)
+
+    def __sub__(self, other):
+        """
+        >>> a = ArrayIntervall.from_str('0:10, 20:30', shape=50)
+        >>> b = ArrayIntervall.from_str('5:25, 40:50', shape=50)
+        >>> a - b
+        ArrayIntervall("0:5, 25:30", shape=(50,))
+        """
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def __xor__(self, other):
+        """
+        >>> a = ArrayIntervall.from_str('0:10, 20:30', shape=50)
+        >>> b = ArrayIntervall.from_str('5:25, 40:50', shape=50)
+        >>> a ^ b
+        ArrayIntervall("0:5, 10:20, 25:30, 40:50", shape=(50,))
+        """
+        return self._combine(other, np.logical_xor)
+
+    def __invert__(self):
+        """
+        >>> ~ArrayIntervall.from_str('0:10, 20:30', shape=50)
+        ArrayIntervall("10:20, 30:50", shape=(50,))
+        """
+        if self.shape is None:
+            raise RuntimeError(
+                f'You cannot invert an {self.__class__.__name__},\n'
+                f'when the shape is unknown.')
+        intervals = self.normalized_array
+        edges = np.concatenate([[0], intervals.ravel(), [self.shape[-1]]])
+        ai = zeros(shape=self.shape)
+        ai._add(edges.reshape(-1, 2))
+        return ai
+
+    def sum(self):
+        """
+        Number of True values, i.e. the total length of the intervals.
+
+        >>> ArrayIntervall.from_str('0:10, 20:30', shape=50).sum()
+        20
+        """
+        intervals = self.normalized_array
+        return int(np.sum(intervals[:, 1] - intervals[:, 0]))
+
+    count_nonzero = sum
+
+
+def _contains(intervals, index):
+    """
+    Whether the normalized intervals contain the indices.
+
+    >>> _contains(np.array([[2, 4], [6, 7]]), np.arange(8))
+    array([False, False,  True,  True, False, False,  True, False])
+    """
+    if len(intervals) == 0:
+        return np.zeros(np.shape(index), dtype=bool)
+    # The last interval, that starts before or at index.
+    candidate = np.searchsorted(intervals[:, 0], index, side='right') - 1
+    return (candidate >= 0) & (intervals[np.maximum(candidate, 0), 1] > index)
+
+
+def overlap_count(intervalls):
+    """
+    Counts for each sample, how many ArrayIntervalls are active (e.g. the
+    number of active speakers) with a sweep over the interval edges.
+
+    Args:
+        intervalls: Iterable of ArrayIntervall objects.
+
+    Returns:
+        (N, 3) int64 array, where each row contains the start, the stop and
+        the number of active ArrayIntervalls of a segment. Segments without
+        activity are omitted and neighboring segments have different
+        counts.
+
+    >>> a = ArrayIntervall.from_str('0:10, 20:30', shape=50)
+    >>> b = ArrayIntervall.from_str('5:25, 40:50', shape=50)
+    >>> c = ArrayIntervall.from_str('5:10', shape=50)
+    >>> overlap_count([a, b, c])
+    array([[ 0,  5,  1],
+           [ 5, 10,  3],
+           [10, 20,  1],
+           [20, 25,  2],
+           [25, 30,  1],
+           [40, 50,  1]])
+
+    Select the segments with overlap:
+
+    >>> counts = overlap_count([a, b, c])
+    >>> ArrayIntervall.from_edges(*counts[counts[:, 2] >= 2, :2].T)
+    ArrayIntervall("5:10, 20:25", shape=None)
+    """
+    intervals = np.concatenate(
+        [np.zeros((0, 2), dtype=np.int64)]
+        + [ai.normalized_array for ai in intervalls]
+    )
+    # +1 at each start, -1 at each stop.
+    edges, inverse = np.unique(intervals.ravel(), return_inverse=True)
+    delta = np.bincount(
+        inverse, weights=np.tile([1, -1], len(intervals)),
+        minlength=len(edges),
+    ).astype(np.int64)
+
+    # Edges, where one interval stops and another starts, do not change the
+    # count.
+    keep = delta != 0
+    edges = edges[keep]
+    count = np.cumsum(delta[keep])
+
+    segments = np.stack([edges[:-1], edges[1:], count[:-1]], axis=-1)
+    return segments[segments[:, 2] > 0]
@@ -1,64 +1,116 @@
+# cython: language_level=3
+"""
+Cython kernels for the ArrayIntervall.
 
-# Does not work in ipynb
-# from libcpp.vector cimport vector
-# from libcpp.pair cimport pair
+All indices are int64, the intervals are (N, 2) int64 arrays with start and
+stop (exclusive) of each interval. util_numpy contains a pure NumPy
+implementation with the same interface, that is used, when this extension
+is not compiled.
+"""
+import numpy as np
 
-# ToDO: better place for testcode
-#       http://ntsvr1:1619/notebooks/chime5/2018_05_17_tf_blstm.ipynb
+cimport cython
+from libc.stdint cimport int64_t
 
-def cy_non_intersection(interval, intervals):
-    cdef:
-        int start
-        int end
-        int i_start
-        int i_end
-        list new_interval
-    start, end = interval
-    new_interval = []
-
-    for i_start, i_end in intervals:
 
-        if start < i_start < end:
-            i_start = end
-        elif start < i_end < end:
-            i_end = start
-        elif i_start < start and end < i_end:
-            new_interval.append((i_start, start))
-            i_start = end
+def _as_intervals(intervals):
+    return np.ascontiguousarray(intervals, dtype=np.int64).reshape(-1, 2)
 
-        if i_start < i_end:
-            new_interval.append((i_start, i_end))
-
-    return tuple(new_interval)
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def cy_non_intersection(interval, intervals):
+    """
+    Removes interval from each of the intervals.
+
+    >>> cy_non_intersection((5, 15), [(0, 10), (12, 20), (6, 8), (30, 40)])
+    array([[ 0,  5],
+           [15, 20],
+           [30, 40]])
+    """
+    cdef:
+        int64_t start
+        int64_t end
+        int64_t i_start
+        int64_t i_end
+        Py_ssize_t i
+        Py_ssize_t n = 0
+        const int64_t[:, ::1] view = _as_intervals(intervals)
+        int64_t[:, ::1] out_view
 
+    start, end = interval
+    out = np.empty((2 * view.shape[0], 2), dtype=np.int64)
+    out_view = out
+
+    for i in range(view.shape[0]):
+        i_start = view[i, 0]
+        i_end = view[i, 1]
+        if start >= end or i_end <= start or end <= i_start:
+            # No overlap
+            if i_start < i_end:
+                out_view[n, 0] = i_start
+                out_view[n, 1] = i_end
+                n += 1
+            continue
+        if i_start < start:
+            out_view[n, 0] = i_start
+            out_view[n, 1] = start
+            n += 1
+        if end < i_end:
+            out_view[n, 0] = end
+            out_view[n, 1] = i_end
+            n += 1
+
+    return out[:n]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
 def cy_intersection(interval, intervals):
+    """
+    Clips each of the intervals to interval.
+
+    >>> cy_intersection((5, 15), [(0, 10), (12, 20), (6, 8), (30, 40)])
+    array([[ 5, 10],
+           [12, 15],
+           [ 6,  8]])
+    """
     cdef:
-        int start
-        int end
-        int i_start
-        int i_end
-        list new_interval
+        int64_t start
+        int64_t end
+        int64_t i_start
+        int64_t i_end
+        Py_ssize_t i
+        Py_ssize_t n = 0
+        const int64_t[:, ::1] view = _as_intervals(intervals)
+        int64_t[:, ::1] out_view
 
     start, end = interval
-    new_interval = []
+    out = np.empty((view.shape[0], 2), dtype=np.int64)
+    out_view = out
 
-    for i_start, i_end in intervals:
-        i_start = max(start, i_start)
-        i_end = min(end, i_end)
+    for i in range(view.shape[0]):
+        i_start = max(start, view[i, 0])
+        i_end = min(end, view[i, 1])
         if i_start < i_end:
-            new_interval.append((i_start, i_end))
+            out_view[n, 0] = i_start
+            out_view[n, 1] = i_end
+            n += 1
 
-    return tuple(new_interval)
+    return out[:n]
 
 
 def cy_parse_item(item, shape):
-
+    """
+    >>> cy_parse_item(slice(10, 2**40), None)
+    (10, 1099511627776)
+    >>> cy_parse_item(slice(None, None), (2**40,))
+    (0, 1099511627776)
+    """
     cdef:
-        int start
-        int end
-        int v
-        int size
+        int64_t start
+        int64_t stop
+        int64_t size = 0
 
     if shape is not None:
         size = shape[-1]
@@ -95,44 +147,38 @@ def cy_parse_item(item, shape):
         assert start <= size, (start, item)
         assert stop <= size, (stop, item)
 
-    if start < 0:
-        assert shape is not None
-        start = start % size
-    if stop < 0:
-        assert shape is not None
-        stop = start % size
-
     return start, stop
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
 def cy_str_to_intervalls(string):
-
+    """
+    >>> cy_str_to_intervalls('1:4, 5:20, 21:25,')
+    array([[ 1,  4],
+           [ 5, 20],
+           [21, 25]])
+    """
     cdef:
-        str intervalls_string
         str intervall_string
         str start_str
         str end_str
-        int start
-        int end
-        list intervals
+        list intervall_strings
+        Py_ssize_t i
+        int64_t[:, ::1] out_view
 
-    intervalls_string = string
-
-#     start, end = interval
-    intervals = []
-
-#     for i_start, i_end in intervals:
-
-    for intervall_string in intervalls_string.replace(' ', '').strip(',').split(','):
+    intervall_strings = string.replace(' ', '').strip(',').split(',')
+    out = np.empty((len(intervall_strings), 2), dtype=np.int64)
+    out_view = out
 
+    for i in range(len(intervall_strings)):
+        intervall_string = intervall_strings[i]
         try:
             start_str, end_str = intervall_string.split(':')
         except Exception as e:
             print('intervall_string in cy_str_to_intervalls', repr(intervall_string))
             raise Exception(intervall_string) from e
-        start = int(start_str)
-        end = int(end_str)
-
-        intervals.append((start, end))
+        out_view[i, 0] = int(start_str)
+        out_view[i, 1] = int(end_str)
 
-    return tuple(intervals)
\ No newline at end of file
+    return out
@@ -0,0 +1,109 @@
+"""
+Pure NumPy implementation of the kernels in util.pyx.
+
+Used by the ArrayIntervall, when the Cython extension is not compiled.
+The functions have the same names, arguments and results as their Cython
+counterparts.
+"""
+import numpy as np
+
+
+def _as_intervals(intervals):
+    return np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+
+
+def cy_non_intersection(interval, intervals):
+    """
+    Removes interval from each of the intervals.
+
+    >>> cy_non_intersection((5, 15), [(0, 10), (12, 20), (6, 8), (30, 40)])
+    array([[ 0,  5],
+           [15, 20],
+           [30, 40]])
+    """
+    start, end = interval
+    intervals = _as_intervals(intervals)
+    if start >= end:
+        return intervals[intervals[:, 0] < intervals[:, 1]]
+    # The parts before and behind interval, interleaved to keep the order.
+    pieces = np.stack([
+        np.stack([
+            intervals[:, 0], np.minimum(intervals[:, 1], start)], axis=-1),
+        np.stack([
+            np.maximum(intervals[:, 0], end), intervals[:, 1]], axis=-1),
+    ], axis=1).reshape(-1, 2)
+    return pieces[pieces[:, 0] < pieces[:, 1]]
+
+
+def cy_intersection(interval, intervals):
+    """
+    Clips each of the intervals to interval.
+
+    >>> cy_intersection((5, 15), [(0, 10), (12, 20), (6, 8), (30, 40)])
+    array([[ 5, 10],
+           [12, 15],
+           [ 6,  8]])
+    """
+    start, end = interval
+    intervals = np.clip(_as_intervals(intervals), start, end)
+    return intervals[intervals[:, 0] < intervals[:, 1]]
+
+
+def cy_parse_item(item, shape):
+    """
+    >>> cy_parse_item(slice(10, 2**40), None)
+    (10, 1099511627776)
+    >>> cy_parse_item(slice(None, None), (2**40,))
+    (0, 1099511627776)
+    """
+    if shape is not None:
+        size = int(shape[-1])
+
+    if not isinstance(item, (slice)):
+        raise AssertionError(
+            f'Expect item ({item}) to has the type slice and not {type(item)}.'
+        )
+    assert item.step is None, (item, 'Step is not supported.')
+
+    if item.start is None:
+        start = 0
+    else:
+        start = int(item.start)
+    if item.stop is None:
+        if shape is None:
+            raise RuntimeError(
+                'You tried to slice an ArrayIntervall with unknown shape '
+                'without a stop value.\n'
+                'This is not supported, either the shape has to be known\n'
+                'or you have to specify a stop value for the slice '
+                '(i.e. array_intervall[:stop])\n'
+                'You called the array intervall with:\n'
+                f'    array_intervall[{item}]'
+            )
+        stop = size
+    else:
+        stop = int(item.stop)
+
+    assert start >= 0, (start, item)
+    assert stop >= 0, (stop, item)
+    if shape is not None:
+        assert start <= size, (start, item)
+        assert stop <= size, (stop, item)
+
+    return start, stop
+
+
+def cy_str_to_intervalls(string):
+    """
+    >>> cy_str_to_intervalls('1:4, 5:20, 21:25,')
+    array([[ 1,  4],
+           [ 5, 20],
+           [21, 25]])
+    """
+    intervall_strings = string.replace(' ', '').strip(',').split(',')
+    values = ':'.join(intervall_strings).split(':')
+    if len(values) != 2 * len(intervall_strings):
+        for intervall_string in intervall_strings:
+            if intervall_string.count(':') != 1:
+                raise Exception(intervall_string)
+    return np.array(values, dtype=np.int64).reshape(-1, 2)
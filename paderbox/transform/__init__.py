@@ -4,21 +4,32 @@ This module deals with all sorts of acoustic features and transforms.
 from .module_stft import (
     stft,
     istft,
+    batch_stft,
     STFT,
+    stft_from_file,
+    MultiResolutionSTFT,
     spectrogram,
     stft_to_spectrogram,
     spectrogram_to_energy_per_frame,
     get_stft_center_frequencies,
 )
+from .module_streaming import StreamingSTFT, StreamingISTFT
+from .module_fft import fft_backend, get_fft_backend
 
 from .module_filter import (
     preemphasis,
     inverse_preemphasis,
     offset_compensation,
     preemphasis_with_offset_compensation,
+    StatefulFilter,
+    Preemphasis,
+    InversePreemphasis,
+    OffsetCompensation,
+    PreemphasisWithOffsetCompensation,
 )
 
 from .module_fbank import fbank, logfbank
 from .module_mfcc import mfcc, mfcc_velocity_acceleration
-from .module_normalize import normalize_mean_variance
-from .module_resample import resample_sox
+from .module_feature_pipeline import FeaturePipeline
+from .module_normalize import normalize_mean_variance, MeanVarianceNormalizer
+from .module_resample import resample_sox, resample_polyphase
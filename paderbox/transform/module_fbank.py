@@ -2,6 +2,7 @@
 Provides fbank features and the fbank filterbank.
 """
 
+import functools
 from typing import Optional
 
 from cached_property import cached_property
@@ -9,8 +10,7 @@ import numpy as np
 import scipy.signal
 
 from .module_filter import preemphasis_with_offset_compensation
-from .module_stft import stft
-from .module_stft import stft_to_spectrogram
+from .module_stft import spectrogram
 
 
 # pylint: disable=too-many-arguments,line-too-long
@@ -23,7 +23,8 @@ class MelTransform:
             n_mels: Optional[int] = 40,
             fmin: Optional[int] = 50,
             fmax: Optional[int] = None,
-            log: bool = True
+            log: bool = True,
+            dtype=None,
     ):
         """
         Transforms linear spectrogram to (log) mel spectrogram.
@@ -35,6 +36,8 @@ class MelTransform:
             fmin: lowest frequency (onset of first filter)
             fmax: highest frequency (offset of last filter)
             log: apply log to mel spectrogram
+            dtype: None or the floating point precision, e.g. np.float32.
+                When given, the filterbank and the output have this dtype.
 
         >>> mel_transform = MelTransform(16000, 512)
         >>> spec = np.zeros((100, 257))
@@ -44,6 +47,8 @@ class MelTransform:
         >>> rec = mel_transform.inverse(logmelspec)
         >>> rec.shape
         (100, 257)
+        >>> MelTransform(16000, 512, dtype=np.float32)(spec).dtype
+        dtype('float32')
         """
         self.sample_rate = sample_rate
         self.fft_length = fft_length
@@ -51,22 +56,43 @@ class MelTransform:
         self.fmin = fmin
         self.fmax = fmax
         self.log = log
+        self.dtype = dtype
 
     @cached_property
     def fbanks(self):
         """Create filterbank matrix according to member variables."""
-        import librosa
-        fbanks = librosa.filters.mel(
+        fbanks = _get_mel_filterbank(
+            sample_rate=self.sample_rate,
+            fft_length=self.fft_length,
             n_mels=self.n_mels,
-            n_fft=self.fft_length,
-            sr=self.sample_rate,
             fmin=self.fmin,
             fmax=self.fmax,
-            htk=True,
-            norm=None
         )
-        fbanks = fbanks / fbanks.sum(axis=-1, keepdims=True)
-        return fbanks.T
+        if self.dtype is not None:
+            fbanks = fbanks.astype(self.dtype)
+        return fbanks
+
+    @cached_property
+    def bands(self):
+        """The nonzero part of each filter as tuple (start, stop, weights).
+
+        The mel filters are triangles, i.e. each filter is only nonzero in a
+        few neighbouring frequency bins. Applying only the nonzero part
+        is much faster than the multiplication with the dense fbanks.
+        """
+        bands = _get_mel_filterbank_bands(
+            sample_rate=self.sample_rate,
+            fft_length=self.fft_length,
+            n_mels=self.n_mels,
+            fmin=self.fmin,
+            fmax=self.fmax,
+        )
+        if self.dtype is not None:
+            bands = [
+                (start, stop, weights.astype(self.dtype))
+                for start, stop, weights in bands
+            ]
+        return bands
 
     @cached_property
     def ifbanks(self):
@@ -74,7 +100,26 @@ class MelTransform:
         return np.linalg.pinv(self.fbanks.T).T
 
     def __call__(self, x):
-        x = np.dot(x, self.fbanks)
+        if self.dtype is not None:
+            x = np.asarray(x, dtype=self.dtype)
+        else:
+            x = np.asarray(x)
+        # The bands only read x[..., start:stop], check the shape like
+        # np.dot(x, self.fbanks) does.
+        assert x.shape[-1] == self.fbanks.shape[0], (
+            x.shape, self.fbanks.shape)
+        # Same dtype as np.dot(x, self.fbanks).
+        dtype = np.result_type(x.dtype, self.fbanks.dtype)
+        out = np.empty((*x.shape[:-1], len(self.bands)), dtype=dtype)
+        for i, (start, stop, weights) in enumerate(self.bands):
+            # einsum instead of matmul: The BLAS result of matmul depends on
+            # the number of frames, i.e. it would differ for chunked input.
+            out[..., i] = np.einsum(
+                '...k,k->...',
+                x[..., start:stop],
+                weights.astype(dtype, copy=False),
+            )
+        x = out
         if self.log:
             x = np.log(x + 1e-18)
         return x
@@ -86,10 +131,64 @@ class MelTransform:
         return np.maximum(np.dot(x, self.ifbanks), 0.)
 
 
+@functools.lru_cache(maxsize=32)
+def _get_mel_filterbank(sample_rate, fft_length, n_mels, fmin, fmax):
+    """Returns the normalized mel filterbank with shape (frequencies, n_mels).
+
+    The filterbanks are cached for the whole process, because the calculation
+    with librosa is expensive compared to the application of a filterbank.
+    The returned array is read only, because it is shared.
+    """
+    import librosa
+    fbanks = librosa.filters.mel(
+        n_mels=n_mels,
+        n_fft=fft_length,
+        sr=sample_rate,
+        fmin=fmin,
+        fmax=fmax,
+        htk=True,
+        norm=None
+    )
+    fbanks = fbanks / fbanks.sum(axis=-1, keepdims=True)
+    fbanks = np.ascontiguousarray(fbanks.T)
+    fbanks.flags.writeable = False
+    return fbanks
+
+
+@functools.lru_cache(maxsize=32)
+def _get_mel_filterbank_bands(sample_rate, fft_length, n_mels, fmin, fmax):
+    """Returns the nonzero part of each mel filter, see MelTransform.bands.
+
+    >>> bands = _get_mel_filterbank_bands(16000, 512, 40, 50, None)
+    >>> len(bands)
+    40
+    >>> start, stop, weights = bands[0]
+    >>> start, stop, weights.shape
+    (2, 5, (3,))
+    """
+    fbanks = _get_mel_filterbank(sample_rate, fft_length, n_mels, fmin, fmax)
+    bands = []
+    for fbank in fbanks.T:
+        nonzero = np.flatnonzero(fbank)
+        if len(nonzero) == 0:
+            # Filters without any frequency bin (low frequencies and short
+            # fft_length).
+            start, stop = 0, 0
+        else:
+            start, stop = nonzero[0], nonzero[-1] + 1
+        # librosa returns float32. Float64 avoids a cast in
+        # MelTransform.__call__ for the common float64 input.
+        weights = fbank[start:stop].astype(np.float64)
+        weights.flags.writeable = False
+        bands.append((int(start), int(stop), weights))
+    return tuple(bands)
+
+
 def fbank(time_signal, sample_rate=16000, window_length=400, stft_shift=160,
           number_of_filters=23, stft_size=512, lowest_frequency=0,
           highest_frequency=None, preemphasis_factor=0.97,
-          window=scipy.signal.windows.hamming, denoise=False):
+          window=scipy.signal.windows.hamming, denoise=False,
+          fft_backend=None, dtype=None, chunk_size=1024):
     """
     Compute Mel-filterbank energy features from an audio signal.
 
@@ -117,6 +216,16 @@ def fbank(time_signal, sample_rate=16000, window_length=400, stft_shift=160,
         0 is no filter. Default is 0.97.
     :param window: window function used for stft
     :param denoise: ???.
+    :param fft_backend: None, name or object of the FFT backend.
+        See paderbox.transform.module_fft.
+    :param dtype: None or the floating point precision of the STFT and the
+        filterbank, e.g. np.float32. With np.float32 the relative error of
+        the features (in the used range) compared to double precision is
+        typically below 1e-4.
+    :param chunk_size: Number of frames, for which the STFT, the power
+        spectrum and the mel filterbank are calculated at once. The complex
+        STFT of the whole signal is never materialized. None calculates all
+        frames at once.
     :returns: A numpy array of size (frames by number_of_filters) containing the
         Mel filterbank features.
     """
@@ -124,24 +233,24 @@ def fbank(time_signal, sample_rate=16000, window_length=400, stft_shift=160,
     time_signal = preemphasis_with_offset_compensation(
         time_signal, preemphasis_factor)
 
-    stft_signal = stft(
-        time_signal,
-        size=stft_size, shift=stft_shift,
-        window=window, window_length=window_length,
-        fading=None
-    )
-
-    spectrogram = stft_to_spectrogram(stft_signal) / stft_size
-
     mel_transform = MelTransform(
         sample_rate=sample_rate,
         fft_length=stft_size,
         n_mels=number_of_filters,
         fmin=lowest_frequency,
         fmax=highest_frequency,
-        log=False
+        log=False,
+        dtype=dtype,
+    )
+
+    feature = spectrogram(
+        time_signal,
+        size=stft_size, shift=stft_shift,
+        window=window, window_length=window_length,
+        fading=None, fft_backend=fft_backend, dtype=dtype,
+        chunk_size=chunk_size,
+        transform=lambda power: mel_transform(power / stft_size),
     )
-    feature = mel_transform(spectrogram)
 
     if denoise:
         feature -= np.min(feature, axis=0)
@@ -177,7 +286,8 @@ def mel2hz(mel):
 def logfbank(time_signal, sample_rate=16000, window_length=400, stft_shift=160,
              number_of_filters=23, stft_size=512, lowest_frequency=0,
              highest_frequency=None, preemphasis_factor=0.97,
-             window=scipy.signal.windows.hamming, denoise=False):
+             window=scipy.signal.windows.hamming, denoise=False,
+             fft_backend=None, dtype=None, chunk_size=1024):
     """Generates log fbank features from time signal.
 
     Simply wraps fbank function. See parameters there.
@@ -193,5 +303,8 @@ def logfbank(time_signal, sample_rate=16000, window_length=400, stft_shift=160,
         highest_frequency=highest_frequency,
         preemphasis_factor=preemphasis_factor,
         window=window,
-        denoise=denoise
+        denoise=denoise,
+        fft_backend=fft_backend,
+        dtype=dtype,
+        chunk_size=chunk_size,
     ))
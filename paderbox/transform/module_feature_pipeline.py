@@ -0,0 +1,281 @@
+"""
+Calculation of several features of a time signal in one pass.
+"""
+import numpy as np
+import scipy.signal
+from scipy.fftpack import dct
+
+from .module_fbank import MelTransform
+from .module_fft import get_fft_backend
+from .module_filter import preemphasis_with_offset_compensation
+from .module_mfcc import _lifter
+from .module_mfcc import _deltas
+from .module_stft import _get_dtypes
+from .module_stft import _stft_chunked
+from .module_stft import _stft_segments
+from .module_stft import stft_to_spectrogram
+
+
+class FeaturePipeline:
+    outputs_choices = (
+        'spectrogram', 'energy', 'fbank', 'logfbank', 'mfcc',
+        'delta', 'delta_delta',
+    )
+
+    def __init__(
+            self,
+            outputs=('logfbank', 'mfcc'),
+            *,
+            sample_rate=16000,
+            window_length=400,
+            stft_shift=160,
+            stft_size=512,
+            number_of_filters=26,
+            numcep=13,
+            lowest_frequency=0,
+            highest_frequency=None,
+            preemphasis_factor=0.97,
+            ceplifter=22,
+            window=scipy.signal.windows.hamming,
+            denoise=False,
+            delta_width=9,
+            fft_backend=None,
+            dtype=None,
+            chunk_size=1024,
+    ):
+        """
+        Calculates the requested features of a time signal, while the
+        preemphasis, the STFT and the filterbank are calculated only once.
+
+        The outputs are identical to the corresponding functions with the
+        same parameters:
+         - 'spectrogram': Power spectrum of the preemphasized signal, i.e.
+            the input of the filterbank (before the division by stft_size).
+         - 'energy': Sum of 'spectrogram' over the frequencies, where zeros
+            are replaced by eps (see spectrogram_to_energy_per_frame).
+         - 'fbank': fbank
+         - 'logfbank': logfbank
+         - 'mfcc': mfcc
+         - 'delta', 'delta_delta': delta of the mfcc with order 1 and 2
+            along the frame axis.
+
+        Args:
+            outputs: The names of the requested features.
+            sample_rate: See fbank and mfcc.
+            window_length:
+            stft_shift:
+            stft_size:
+            number_of_filters:
+            numcep:
+            lowest_frequency:
+            highest_frequency:
+            preemphasis_factor:
+            ceplifter:
+            window:
+            denoise:
+            delta_width: Number of frames for the delta features.
+                See delta.
+            fft_backend:
+            dtype:
+            chunk_size: Number of frames that are processed at once, when
+                'spectrogram' is not requested. See fbank.
+
+        >>> pipeline = FeaturePipeline(['logfbank', 'mfcc', 'delta', 'energy'])
+        >>> x = np.random.normal(size=16000)
+        >>> features = pipeline(x)
+        >>> list(features)
+        ['energy', 'logfbank', 'mfcc', 'delta']
+        >>> features['energy'].shape, features['mfcc'].shape
+        ((99,), (99, 13))
+
+        Reuse the arrays of a previous call:
+
+        >>> features = pipeline(x + 1, out=features)
+        """
+        outputs = tuple(outputs)
+        for output in outputs:
+            if output not in self.outputs_choices:
+                raise ValueError(
+                    f'Unknown output {output!r}. '
+                    f'Choose from {self.outputs_choices}.'
+                )
+        self.outputs = outputs
+        self.sample_rate = sample_rate
+        self.window_length = window_length
+        self.stft_shift = stft_shift
+        self.stft_size = stft_size
+        self.number_of_filters = number_of_filters
+        self.numcep = numcep
+        self.lowest_frequency = lowest_frequency
+        self.highest_frequency = highest_frequency
+        self.preemphasis_factor = preemphasis_factor
+        self.ceplifter = ceplifter
+        self.window = window
+        self.denoise = denoise
+        self.delta_width = delta_width
+        self.fft_backend = fft_backend
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+
+        self.mel_transform = MelTransform(
+            sample_rate=sample_rate,
+            fft_length=stft_size,
+            n_mels=number_of_filters,
+            fmin=lowest_frequency,
+            fmax=highest_frequency or sample_rate / 2,
+            log=False,
+            dtype=dtype,
+        )
+
+    def _needs(self, *names):
+        return any(name in self.outputs for name in names)
+
+    @staticmethod
+    def _get_buffer(out, name, shape, dtype):
+        """Returns out[name], when it has the shape and dtype, else None."""
+        if out is not None and name in out:
+            buffer = out[name]
+            if buffer.shape == tuple(shape) and buffer.dtype == dtype:
+                return buffer
+        return None
+
+    def _store(self, features, out, name, value):
+        """Stores value in features, in out[name], when possible."""
+        buffer = self._get_buffer(out, name, value.shape, value.dtype)
+        if buffer is None:
+            value = np.ascontiguousarray(value)
+        elif buffer is not value:
+            buffer[...] = value
+            value = buffer
+        features[name] = value
+
+    def __call__(self, time_signal, out=None):
+        """
+        Args:
+            time_signal: Time signal with shape (..., samples).
+            out: None or a dict with arrays, e.g. the output of a previous
+                call. Arrays with the correct shape and dtype are reused for
+                the outputs, i.e. they are overwritten.
+
+        Returns:
+            Dict with the requested features. The frame axis is the second
+            last axis, except for 'energy', where it is the last axis.
+        """
+        time_signal = preemphasis_with_offset_compensation(
+            time_signal, self.preemphasis_factor)
+
+        time_signal_seg, window, axis = _stft_segments(
+            time_signal, self.stft_shift, axis=-1, window=self.window,
+            window_length=self.window_length, fading=None, pad=True,
+            symmetric_window=False, dtype=self.dtype,
+        )
+        if self.dtype is None:
+            complex_dtype = np.dtype(np.complex128)
+        else:
+            _, complex_dtype = _get_dtypes(self.dtype)
+        real_dtype = np.finfo(complex_dtype).dtype
+        shape = time_signal_seg.shape[:-1]
+
+        def stft_chunked(transform, out):
+            return _stft_chunked(
+                time_signal_seg, window, size=self.stft_size, axis=axis,
+                chunk_size=self.chunk_size,
+                rfft=get_fft_backend(self.fft_backend).rfft,
+                dtype=complex_dtype, transform=transform, out=out,
+            )
+
+        def mel_transform(power):
+            return self.mel_transform(power / self.stft_size)
+
+        features = {}
+        need_fbank = self._needs(
+            'fbank', 'logfbank', 'mfcc', 'delta', 'delta_delta')
+        need_energy = self._needs('energy')
+
+        if self._needs('spectrogram'):
+            power = stft_chunked(
+                stft_to_spectrogram,
+                self._get_buffer(
+                    out, 'spectrogram',
+                    (*shape, self.stft_size // 2 + 1), real_dtype,
+                ),
+            )
+            features['spectrogram'] = power
+            if need_energy:
+                energy = np.sum(power, axis=-1)
+            if need_fbank:
+                fbank = mel_transform(power)
+        elif need_energy:
+            # Stack the filterbank and the energy to calculate both in one
+            # pass over the chunks.
+            def transform(stft_signal):
+                power = stft_to_spectrogram(stft_signal)
+                energy = np.sum(power, axis=-1, keepdims=True)
+                if need_fbank:
+                    return np.concatenate(
+                        [mel_transform(power), energy], axis=-1)
+                else:
+                    return energy
+
+            stacked = stft_chunked(transform, None)
+            energy = stacked[..., -1]
+            fbank = stacked[..., :-1]
+        elif need_fbank:
+            fbank = stft_chunked(
+                lambda stft_signal: mel_transform(
+                    stft_to_spectrogram(stft_signal)),
+                None,
+            )
+
+        if need_energy:
+            self._store(features, out, 'energy', energy)
+            energy = features['energy']
+            energy[energy == 0] = np.finfo(float).eps
+
+        if not need_fbank:
+            return self._sort(features)
+
+        if self.denoise:
+            fbank -= np.min(fbank, axis=0)
+        fbank[fbank == 0] = np.finfo(float).eps
+        if self._needs('fbank'):
+            self._store(features, out, 'fbank', fbank)
+
+        if not self._needs('logfbank', 'mfcc', 'delta', 'delta_delta'):
+            return self._sort(features)
+
+        if self._needs('logfbank'):
+            logfbank = np.log(fbank, out=self._get_buffer(
+                out, 'logfbank', fbank.shape, fbank.dtype))
+            self._store(features, out, 'logfbank', logfbank)
+        elif self._needs('fbank'):
+            logfbank = np.log(fbank)
+        else:
+            logfbank = np.log(fbank, out=fbank)
+
+        if not self._needs('mfcc', 'delta', 'delta_delta'):
+            return self._sort(features)
+
+        mfcc = _lifter(
+            dct(logfbank, type=2, axis=-1, norm='ortho')[..., :self.numcep],
+            self.ceplifter,
+        )
+        if self._needs('mfcc'):
+            self._store(features, out, 'mfcc', mfcc)
+        # All requested orders of the deltas in one pass.
+        names, orders = [], []
+        for name, order in [('delta', 1), ('delta_delta', 2)]:
+            if self._needs(name):
+                names.append(name)
+                orders.append(order)
+        if orders:
+            values = _deltas(mfcc, self.delta_width, orders, axis=-2)
+            for name, value in zip(names, values):
+                self._store(features, out, name, value)
+        return self._sort(features)
+
+    def _sort(self, features):
+        return {
+            name: features[name]
+            for name in self.outputs_choices if name in features
+        }
@@ -0,0 +1,264 @@
+"""
+Selection of the FFT implementation that is used in the transform package.
+
+Supported backends:
+ - 'numpy': `numpy.fft` (default, single threaded)
+ - 'scipy': `scipy.fft` with the `workers` argument for multithreading
+ - 'pyfftw': `pyfftw.interfaces.numpy_fft` with threads, plan cache and
+   optional wisdom file (requires pyFFTW)
+
+The backend can be selected per call (argument `fft_backend` of e.g. `stft`),
+with the context manager `fft_backend` or with the environment variables
+`PADERBOX_FFT_BACKEND` and `PADERBOX_FFT_WORKERS`. A per call argument has
+the highest priority, the environment variables the lowest.
+
+>>> from paderbox.transform import stft
+>>> x = np.random.normal(size=(4, 1000))
+>>> with fft_backend('scipy', workers=2):
+...     X = stft(x)
+>>> np.testing.assert_allclose(X, stft(x, fft_backend='numpy'), atol=1e-10)
+"""
+import atexit
+import contextlib
+import functools
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from paderbox.utils.mapping import Dispatcher
+
+
+class NumpyFFTBackend:
+    name = 'numpy'
+
+    def __init__(self):
+        _check_numpy_mkl_fft()
+
+    def rfft(self, a, n=None, axis=-1):
+        return np.fft.rfft(a, n=n, axis=axis)
+
+    def irfft(self, a, n=None, axis=-1):
+        return np.fft.irfft(a, n=n, axis=axis)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+
+class ScipyFFTBackend:
+    name = 'scipy'
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers: Number of threads, negative values count from the number
+                of CPUs (i.e. -1 uses all cores). None means single threaded.
+                scipy parallelizes over the independent transforms, i.e. over
+                the frames of an STFT.
+        """
+        import scipy.fft
+        self._fft = scipy.fft
+        self.workers = workers
+
+    def rfft(self, a, n=None, axis=-1):
+        return self._fft.rfft(a, n=n, axis=axis, workers=self.workers)
+
+    def irfft(self, a, n=None, axis=-1):
+        return self._fft.irfft(a, n=n, axis=axis, workers=self.workers)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(workers={self.workers!r})'
+
+
+class PyFFTWBackend:
+    name = 'pyfftw'
+
+    def __init__(
+            self,
+            workers=None,
+            planner_effort='FFTW_ESTIMATE',
+            wisdom_file=None,
+    ):
+        """
+        Args:
+            workers: Number of threads. Negative values count from the
+                number of CPUs (i.e. -1 uses all cores). None means single
+                threaded.
+            planner_effort: FFTW planner effort, e.g. 'FFTW_ESTIMATE' or
+                'FFTW_MEASURE'. A higher effort is only useful in combination
+                with the plan cache or a wisdom file.
+            wisdom_file: Optional path to a pickle file with FFTW wisdom.
+                When the file exists, the wisdom is loaded. At exit of the
+                interpreter the accumulated wisdom is written to this file.
+        """
+        import pyfftw
+        import pyfftw.interfaces.cache
+        import pyfftw.interfaces.numpy_fft
+        self._fft = pyfftw.interfaces.numpy_fft
+
+        if workers is None:
+            workers = 1
+        elif workers < 0:
+            workers = os.cpu_count() + 1 + workers
+        self.workers = workers
+        self.planner_effort = planner_effort
+
+        # Keep the plans between the calls. The STFT calls the same
+        # transform again and again.
+        pyfftw.interfaces.cache.enable()
+
+        self.wisdom_file = wisdom_file
+        if wisdom_file is not None:
+            self.wisdom_file = Path(wisdom_file)
+            _load_fftw_wisdom(self.wisdom_file)
+
+    def rfft(self, a, n=None, axis=-1):
+        return self._fft.rfft(
+            a, n=n, axis=axis,
+            threads=self.workers, planner_effort=self.planner_effort,
+        )
+
+    def irfft(self, a, n=None, axis=-1):
+        return self._fft.irfft(
+            a, n=n, axis=axis,
+            threads=self.workers, planner_effort=self.planner_effort,
+        )
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(workers={self.workers!r}, '
+            f'planner_effort={self.planner_effort!r}, '
+            f'wisdom_file={self.wisdom_file!r})'
+        )
+
+
+_fft_backend_dispatcher = Dispatcher({
+    'numpy': NumpyFFTBackend,
+    'scipy': ScipyFFTBackend,
+    'pyfftw': PyFFTWBackend,
+})
+
+_loaded_wisdom_files = set()
+
+
+def _load_fftw_wisdom(wisdom_file):
+    import pickle
+    import pyfftw
+    if wisdom_file in _loaded_wisdom_files:
+        return
+    _loaded_wisdom_files.add(wisdom_file)
+    if wisdom_file.exists():
+        with wisdom_file.open('rb') as f:
+            pyfftw.import_wisdom(pickle.load(f))
+    atexit.register(_save_fftw_wisdom, wisdom_file)
+
+
+def _save_fftw_wisdom(wisdom_file):
+    import pickle
+    import pyfftw
+    from paderbox.io.atomic import open_atomic
+    with open_atomic(wisdom_file, 'wb') as f:
+        pickle.dump(pyfftw.export_wisdom(), f)
+
+
+def _check_numpy_mkl_fft():
+    # https://github.com/numpy/numpy/issues/11456
+    # https://github.com/ContinuumIO/anaconda-issues/issues/9697
+    # https://github.com/IntelPython/mkl_fft/issues/11
+    # Still there (22.2.19) https://github.com/IntelPython/mkl_fft/issues/24
+    # Estimated that mkl=2019.3 is required (in the moment 2019.1)
+    # $ conda env export --name=base | grep mkl
+    # mkl=2019.1=144
+    global _numpy_mkl_fft_checked
+    if _numpy_mkl_fft_checked:
+        return
+    with open(np.fft.__file__) as f:
+        if 'patch_fft = True' in f.read():
+            raise Exception(
+                'Your Numpy version uses MKL-FFT. That version causes '
+                f'segmentation faults. To fix it, open {np.fft.__file__} and '
+                'edit it such that `patch_fft = True` becomes '
+                '`patch_fft = False`.\n'
+                'Alternatively, select another FFT backend, e.g. '
+                'PADERBOX_FFT_BACKEND=scipy.'
+            )
+    _numpy_mkl_fft_checked = True
+
+
+_numpy_mkl_fft_checked = False
+
+_local = threading.local()
+
+
+def _backend_from_environment():
+    return _cached_backend(
+        os.environ.get('PADERBOX_FFT_BACKEND', 'numpy'),
+        os.environ.get('PADERBOX_FFT_WORKERS', None),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_backend(name, workers):
+    if workers is None or name == 'numpy':
+        return get_fft_backend(name)
+    else:
+        return get_fft_backend(name, workers=int(workers))
+
+
+def get_fft_backend(backend=None, **kwargs):
+    """Returns the FFT backend object.
+
+    Args:
+        backend: None, name of the backend or a backend object.
+            None means the backend of the enclosing `fft_backend` context
+            manager or, if there is none, of the environment variables.
+        **kwargs: Arguments for the backend, e.g. workers.
+            Only allowed, when backend is a str.
+
+    Returns:
+        Object with the methods `rfft` and `irfft`.
+
+    >>> get_fft_backend()
+    NumpyFFTBackend()
+    >>> get_fft_backend('scipy', workers=-1)
+    ScipyFFTBackend(workers=-1)
+    >>> with fft_backend('scipy'):
+    ...     get_fft_backend()
+    ScipyFFTBackend(workers=None)
+    """
+    if backend is None:
+        assert len(kwargs) == 0, kwargs
+        stack = getattr(_local, 'stack', None)
+        if stack:
+            return stack[-1]
+        return _backend_from_environment()
+    elif isinstance(backend, str):
+        return _fft_backend_dispatcher[backend](**kwargs)
+    else:
+        assert len(kwargs) == 0, kwargs
+        return backend
+
+
+@contextlib.contextmanager
+def fft_backend(backend, **kwargs):
+    """Selects the FFT backend for all transforms inside the with statement.
+
+    The selection is thread local.
+
+    Args:
+        backend: Name of the backend or a backend object.
+        **kwargs: Arguments for the backend, e.g. workers.
+
+    >>> with fft_backend('scipy', workers=-1) as backend:
+    ...     backend
+    ScipyFFTBackend(workers=-1)
+    """
+    backend = get_fft_backend(backend, **kwargs)
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    _local.stack.append(backend)
+    try:
+        yield backend
+    finally:
+        _local.stack.pop()
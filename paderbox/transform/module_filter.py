@@ -1,6 +1,10 @@
 """
 Provides general filters, for example preemphasis filter.
 """
+import bisect
+
+import numpy as np
+import scipy.ndimage
 from scipy.signal import lfilter, medfilt
 
 
@@ -48,11 +52,258 @@ def preemphasis_with_offset_compensation(time_signal, p=0.95):
     return lfilter([1, -(1+p), p], [1, -0.999], time_signal)
 
 
-def median(input_signal, window_size=3):
+class StatefulFilter:
+    def __init__(self, b, a):
+        """
+        Linear filter (see scipy.signal.lfilter) for signals that arrive
+        block by block.
+
+        The filter state is kept between the calls, hence the concatenated
+        outputs are identical to filtering the concatenated signal at once.
+        The time axis is the last axis, all other axes are independent
+        signals (e.g. channels). Their shape must not change between calls.
+
+        Args:
+            b: Numerator coefficients.
+            a: Denominator coefficients.
+
+        >>> x = np.random.normal(size=(2, 100))
+        >>> f = StatefulFilter([1., -0.95], [1])
+        >>> y = np.concatenate([f(x[:, :30]), f(x[:, 30:])], axis=-1)
+        >>> np.testing.assert_equal(y, lfilter([1., -0.95], [1], x))
+        """
+        self.b = np.asarray(b, dtype=np.float64)
+        self.a = np.asarray(a, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Forget the internal state to start with a new signal."""
+        self.zi = None
+
+    def __call__(self, block):
+        """
+        Args:
+            block: Signal block with shape (..., samples).
+
+        Returns:
+            The filtered block.
+        """
+        block = np.asarray(block)
+        if self.zi is None:
+            order = max(len(self.a), len(self.b)) - 1
+            self.zi = np.zeros((*block.shape[:-1], order))
+        assert block.shape[:-1] == self.zi.shape[:-1], \
+            (block.shape, self.zi.shape)
+        if block.shape[-1] == 0:
+            # lfilter returns a wrong state for empty input.
+            return np.zeros(block.shape, dtype=np.result_type(
+                block.dtype, self.b.dtype, self.a.dtype))
+        out, self.zi = lfilter(self.b, self.a, block, zi=self.zi)
+        return out
+
+
+class Preemphasis(StatefulFilter):
+    def __init__(self, p=0.95):
+        """Stateful version of preemphasis.
+
+        >>> x = np.random.normal(size=100)
+        >>> f = Preemphasis(0.97)
+        >>> y = np.concatenate([f(x[:30]), f(x[30:])])
+        >>> np.testing.assert_equal(y, preemphasis(x, 0.97))
+        """
+        self.p = p
+        super().__init__([1., -p], [1])
+
+
+class InversePreemphasis(StatefulFilter):
+    def __init__(self, p=0.95):
+        """Stateful version of inverse_preemphasis."""
+        self.p = p
+        super().__init__([1], [1., -p])
+
+
+class OffsetCompensation(StatefulFilter):
+    def __init__(self):
+        """Stateful version of offset_compensation."""
+        super().__init__([1., -1], [1., -0.999])
+
+
+class PreemphasisWithOffsetCompensation(StatefulFilter):
+    def __init__(self, p=0.95):
+        """Stateful version of preemphasis_with_offset_compensation.
+
+        >>> x = np.random.normal(size=(3, 100))
+        >>> f = PreemphasisWithOffsetCompensation(0.97)
+        >>> y = np.concatenate([f(x[:, :1]), f(x[:, 1:])], axis=-1)
+        >>> np.testing.assert_equal(
+        ...     y, preemphasis_with_offset_compensation(x, 0.97))
+        """
+        self.p = p
+        super().__init__([1, -(1+p), p], [1, -0.999])
+
+
+# From this window size on, the running median is faster than sorting each
+# window (scipy.signal.medfilt and scipy.ndimage.median_filter).
+_RUNNING_MEDIAN_MIN_WINDOW_SIZE = 33
+
+
+def _check_median_window_size(window_size):
+    if window_size % 2 != 1:
+        raise ValueError(f'window_size has to be odd, not {window_size}.')
+
+
+def _running_median(signal, window, history, half):
+    """Running median of one channel.
+
+    Keeps the window sorted, hence each sample needs a binary search for
+    the insertion and one for the removal (O(log k) comparisons, the
+    memmove of the list insertion is negligible).
+
+    Args:
+        signal: List with the new samples.
+        window: Sorted list with the samples of the current (incomplete)
+            window, changed inplace.
+        history: The samples of window in temporal order.
+        half: window_size // 2
+
+    Returns:
+        The medians of the completed windows and the new history.
+    """
+    window_size = 2 * half + 1
+    values = history + signal
+    # values[oldest] is the oldest sample in a complete window.
+    oldest = len(history) - window_size + 1
+    insort = bisect.insort
+    bisect_left = bisect.bisect_left
+    medians = []
+    for index, value in enumerate(signal):
+        insort(window, value)
+        if len(window) == window_size:
+            medians.append(window[half])
+            del window[bisect_left(window, values[oldest + index])]
+    return medians, values[len(values) - len(window):]
+
+
+class RunningMedian:
+    def __init__(self, window_size=3):
+        """
+        Median filter for signals that arrive block by block.
+
+        Each call returns the medians of the windows that are completed by
+        the block, i.e. the output is delayed by window_size // 2 samples.
+        Call `flush` after the last block to obtain the remaining medians.
+        The concatenation of all outputs is identical to
+        `median(signal, window_size, axis=-1)` of the concatenated blocks
+        (e.g. zero padding at the borders).
+
+        The time axis is the last axis, all other axes are independent
+        signals.
+
+        Args:
+            window_size: Odd kernel size of the filter.
+
+        >>> x = np.random.normal(size=(2, 100))
+        >>> f = RunningMedian(5)
+        >>> y = [f(x[:, :1]), f(x[:, 1:]), f.flush()]
+        >>> [block.shape for block in y]
+        [(2, 0), (2, 98), (2, 2)]
+        >>> np.testing.assert_equal(
+        ...     np.concatenate(y, axis=-1), median(x, 5, axis=-1))
+        """
+        _check_median_window_size(window_size)
+        self.window_size = window_size
+        self.reset()
+
+    def reset(self):
+        """Forget the internal state to start with a new signal."""
+        self._windows = None
+        self._histories = None
+        self._shape = None
+        self._dtype = None
+
+    def __call__(self, block):
+        """
+        Args:
+            block: Signal block with shape (..., samples).
+
+        Returns:
+            The medians of the completed windows with shape (..., samples).
+        """
+        block = np.asarray(block)
+        half = self.window_size // 2
+        if self._windows is None:
+            self._shape = block.shape[:-1]
+            self._dtype = block.dtype
+            channels = int(np.prod(self._shape, dtype=int))
+            # Zero padding at the begin of the signal.
+            zero = np.zeros((), dtype=block.dtype).item()
+            self._windows = [[zero] * half for _ in range(channels)]
+            self._histories = [[zero] * half for _ in range(channels)]
+        assert block.shape[:-1] == self._shape, (block.shape, self._shape)
+
+        medians = []
+        for channel, signal in enumerate(
+                block.reshape(len(self._windows), block.shape[-1]).tolist()
+        ):
+            channel_medians, self._histories[channel] = _running_median(
+                signal, self._windows[channel], self._histories[channel],
+                half,
+            )
+            medians.append(channel_medians)
+        return np.array(medians, dtype=self._dtype).reshape(
+            *self._shape, -1)
+
+    def flush(self):
+        """
+        Returns the remaining medians, where the signal is padded with
+        zeros. Afterwards the object is reset.
+        """
+        if self._windows is None:
+            return np.zeros((0,))
+        medians = self(np.zeros(
+            (*self._shape, self.window_size // 2), dtype=self._dtype))
+        self.reset()
+        return medians
+
+
+def median(input_signal, window_size=3, axis=None):
     """ Median Filter
 
+    The borders are padded with zeros (see scipy.signal.medfilt). Large
+    kernels use a running median (see RunningMedian), which avoids to sort
+    each window.
+
     :param input_signal: array of values to be filtered
     :param window_size: kernel size for the filter
+    :param axis: None or the axis of a 1D filter, where the other axes are
+        independent signals. None filters 1D signals along the only axis
+        and N-D signals with an N-D kernel (scipy.signal.medfilt).
     :return: filtered output signal of same length as input_signal
+
+    >>> median(np.array([2., 6., 1., 5., 4.]), 3)
+    array([2., 2., 5., 4., 4.])
+    >>> x = np.random.normal(size=(3, 1000))
+    >>> np.testing.assert_equal(
+    ...     median(x, 101, axis=-1),
+    ...     [medfilt(signal, 101) for signal in x],
+    ... )
     """
-    return medfilt(input_signal, window_size)
+    input_signal = np.asarray(input_signal)
+    if axis is None:
+        if input_signal.ndim != 1:
+            return medfilt(input_signal, window_size)
+        axis = 0
+    _check_median_window_size(window_size)
+
+    axis = axis % input_signal.ndim
+    if window_size < _RUNNING_MEDIAN_MIN_WINDOW_SIZE:
+        size = [1] * input_signal.ndim
+        size[axis] = window_size
+        return scipy.ndimage.median_filter(
+            input_signal, size=size, mode='constant')
+
+    running_median = RunningMedian(window_size)
+    signal = np.moveaxis(input_signal, axis, -1)
+    output = np.concatenate(
+        [running_median(signal), running_median.flush()], axis=-1)
+    return np.moveaxis(output, -1, axis)
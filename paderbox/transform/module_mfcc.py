@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 from paderbox.transform.module_stft import stft
 from paderbox.transform.module_fbank import logfbank
@@ -11,7 +13,8 @@ def mfcc(time_signal, sample_rate=16000,
          number_of_filters=26, stft_size=512,
          lowest_frequency=0, highest_frequency=None,
          preemphasis_factor=0.97, ceplifter=22,
-         window=scipy.signal.hamming):
+         window=scipy.signal.hamming, fft_backend=None, dtype=None,
+         chunk_size=1024):
     """
     Compute MFCC features from an audio signal.
 
@@ -42,13 +45,20 @@ def mfcc(time_signal, sample_rate=16000,
         Default is 22.
     :param window: the window function to use for fbank features. Default is
         hamming window.
+    :param fft_backend: None, name or object of the FFT backend.
+        See paderbox.transform.module_fft.
+    :param dtype: None or the floating point precision, e.g. np.float32.
+        See fbank.
+    :param chunk_size: Number of frames that are processed at once in the
+        filterbank calculation. See fbank.
     :returns: A numpy array of size (NUMFRAMES by numcep) containing features.
         Each row holds 1 feature vector.
     """
     feat = logfbank(
         time_signal, sample_rate, window_length, stft_shift,
         number_of_filters, stft_size, lowest_frequency,
-        highest_frequency, preemphasis_factor, window)
+        highest_frequency, preemphasis_factor, window,
+        fft_backend=fft_backend, dtype=dtype, chunk_size=chunk_size)
     feat = dct(feat, type=2, axis=-1, norm='ortho')[..., :numcep]
     feat = _lifter(feat, ceplifter)
 
@@ -73,7 +83,7 @@ def _lifter(cepstra, L=22):
         nframes,ncoeff = np.shape(cepstra)[-2:]
         n = np.arange(ncoeff)
         lift = 1+ (L/2)*np.sin(np.pi*n/L)
-        return lift*cepstra
+        return lift.astype(cepstra.dtype, copy=False)*cepstra
     else:
         # values of L <= 0, do nothing
         return cepstra
@@ -94,15 +104,14 @@ def mfcc_velocity_acceleration(time_signal, *args, **kwargs):
     :return: Stacked features
     """
     mfcc_signal = mfcc(time_signal, *args, **kwargs)
-    delta_mfcc_signal = delta(mfcc_signal, order=1)
-    delta_delta_mfcc_signal = delta(mfcc_signal, order=2)
+    delta_mfcc_signal, delta_delta_mfcc_signal = deltas(mfcc_signal, order=2)
     return np.concatenate(
         (mfcc_signal, delta_mfcc_signal, delta_delta_mfcc_signal),
         axis=1
     )
 
 
-def delta(data, width=9, order=1, axis=-1, trim=True):
+def delta(data, width=9, order=1, axis=-1, trim=True, out=None):
     r'''Compute delta features: local estimate of the derivative
     of the input data along the selected axis.
 
@@ -126,6 +135,10 @@ def delta(data, width=9, order=1, axis=-1, trim=True):
     trim      : bool
         set to `True` to trim the output matrix to the original size.
 
+    out       : np.ndarray or None
+        Optional float64 output array with the shape of data.
+        Only supported for trim=True.
+
     Returns
     -------
     delta_data   : np.ndarray [shape=(d, t) or (d, t + window)]
@@ -141,6 +154,13 @@ def delta(data, width=9, order=1, axis=-1, trim=True):
     if order <= 0 or not isinstance(order, int):
         raise ValueError('order must be a positive integer')
 
+    if trim:
+        if out is not None:
+            out = out[None]
+        return _deltas(data, width, [order], axis, out=out)[0]
+
+    assert out is None, 'out is only supported for trim=True'
+
     half_length = 1 + int(width // 2)
     window = np.arange(half_length - 1., -half_length, -1.)
 
@@ -156,15 +176,108 @@ def delta(data, width=9, order=1, axis=-1, trim=True):
     for _ in range(order):
         delta_x = scipy.signal.lfilter(window, 1, delta_x, axis=axis)
 
-    # Cut back to the original shape of the input data
-    if trim:
-        idx = [slice(None)] * delta_x.ndim
-        idx[axis] = slice(- half_length - data.shape[axis], - half_length)
-        delta_x = delta_x[idx]
-
     return delta_x
 
 
+def deltas(data, width=9, order=2, axis=-1, out=None):
+    '''Compute the delta features of all orders from 1 to `order`.
+
+    Equal to stacking `delta(data, width, o, axis)` for o in 1, ..., order,
+    but the orders are calculated in one pass. Each order is a single
+    convolution with the combined kernel of the repeated difference
+    operator, instead of applying the difference operator `order` times.
+
+    :param data: Input with arbitrary shape, e.g. (..., frames, features).
+    :param width: Number of frames over which to compute the delta feature.
+        See delta.
+    :param order: Highest order.
+    :param axis: Axis along which to compute the deltas, e.g. -2 for
+        (..., frames, features).
+    :param out: Optional float64 output array with shape
+        (order, *data.shape).
+    :return: Array with shape (order, *data.shape).
+
+    >>> x = np.random.normal(size=(4, 100, 13))
+    >>> d = deltas(x, order=2, axis=-2)
+    >>> d.shape
+    (2, 4, 100, 13)
+    >>> np.testing.assert_allclose(
+    ...     d[1], delta(x, order=2, axis=-2), atol=1e-14)
+    '''
+    data = np.atleast_1d(data)
+
+    if width < 3 or np.mod(width, 2) != 1:
+        raise ValueError('width must be an odd integer >= 3')
+
+    if order <= 0 or not isinstance(order, int):
+        raise ValueError('order must be a positive integer')
+
+    return _deltas(data, width, range(1, order + 1), axis, out=out)
+
+
+@functools.lru_cache(maxsize=16)
+def _delta_kernel(width, order):
+    '''Combined kernel of order times the difference operator of delta.
+
+    The first tap is the coefficient of the newest sample (lfilter order).
+
+    >>> _delta_kernel(3, 1)
+    array([ 0.5,  0. , -0.5])
+    >>> _delta_kernel(3, 2)
+    array([ 0.25,  0.  , -0.5 ,  0.  ,  0.25])
+    '''
+    half_length = 1 + width // 2
+    window = np.arange(half_length - 1., -half_length, -1.)
+    window /= np.sum(np.abs(window)**2)
+
+    kernel = np.ones(1)
+    for _ in range(order):
+        kernel = np.convolve(kernel, window)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def _deltas(data, width, orders, axis, out=None):
+    '''Trimmed delta features for each order in orders, see delta.
+
+    delta pads the data with `width` edge values at both sides and applies
+    a causal filter (initial condition zero). Here, the padding is replaced
+    by the mode 'nearest' of scipy.ndimage.correlate1d. Afterwards the first
+    frames are corrected for those taps of the filter that reached the
+    zeros in front of the padding.
+    '''
+    import scipy.ndimage
+
+    axis = axis % data.ndim
+    frames = data.shape[axis]
+    if out is None:
+        out = np.empty((len(orders), *data.shape), dtype=np.float64)
+    assert out.shape == (len(orders), *data.shape), (out.shape, data.shape)
+
+    half_length = 1 + width // 2
+    # Shift between the newest sample of the filter and the output frame.
+    lookahead = width - half_length
+
+    first = np.take(data, [0], axis=axis).astype(np.float64)
+    for out_, order in zip(out, orders):
+        kernel = _delta_kernel(width, order)
+        # The filter output is sum_k kernel[k] * data[t + lookahead - k].
+        # correlate1d calculates
+        # sum_j w[j] * data[t + j - len(w) // 2 - origin]
+        scipy.ndimage.correlate1d(
+            data, kernel[::-1], axis=axis, output=out_, mode='nearest',
+            origin=len(kernel) - 1 - lookahead - len(kernel) // 2,
+        )
+
+        # The taps k with t + lookahead - k < -width used zeros in delta.
+        # suffix[i] = sum(kernel[i:])
+        suffix = np.cumsum(kernel[::-1])[::-1]
+        for t in range(min(len(kernel) - 1 - lookahead - width, frames)):
+            index = (slice(None),) * axis + (slice(t, t + 1),)
+            out_[index] -= suffix[t + lookahead + width + 1] * first
+    return out
+
+
 def modmfcc(
         time_signal, sample_rate=16000,
         stft_win_len=400, stft_shift=160, numcep=30,
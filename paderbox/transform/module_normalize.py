@@ -10,3 +10,210 @@ def normalize_mean_variance(data, axis=0, eps=1e-6):
     """
     return ((data - np.mean(data, axis=axis, keepdims=True)) /
             (np.std(data, axis=axis, keepdims=True) + eps))
+
+
+class MeanVarianceNormalizer:
+    mode_choices = ('utterance', 'sliding', 'global')
+
+    def __init__(self, mode='global', axis=0, eps=1e-6, window=300):
+        """ Mean and variance normalization of features.
+
+        Modes:
+         - 'utterance': Statistics of each call, like normalize_mean_variance.
+         - 'sliding': Statistics of a window of frames around each frame
+            (centered, shifted at the borders to stay inside the signal).
+         - 'global': Running statistics that are accumulated with `update`
+            (Welford/Chan) and can be merged (e.g. from different processes
+            or MPI ranks) with `merge`.
+
+        The statistics are accumulated in float64, while the normalization is
+        applied in the dtype of the data, e.g. float32. Use `out=data` to
+        normalize in place.
+
+        :param mode: One of 'utterance', 'sliding' or 'global'.
+        :param axis: Time dimensions, i.e. the axis or axes that are reduced.
+            Has to be an int for the 'sliding' mode.
+        :param eps: Added to the standard deviation.
+        :param window: Number of frames of the 'sliding' mode.
+
+        >>> normalizer = MeanVarianceNormalizer('global')
+        >>> x = np.random.normal(3, 2, size=(1000, 5)).astype(np.float32)
+        >>> for chunk in np.split(x, 4):
+        ...     normalizer.update(chunk)
+        >>> normalizer.count
+        1000
+        >>> y = normalizer(x, out=x)
+        >>> y is x, y.dtype
+        (True, dtype('float32'))
+
+        Merge the statistics of several workers:
+
+        >>> a, b = MeanVarianceNormalizer(), MeanVarianceNormalizer()
+        >>> a.update(np.arange(4.)[:, None])
+        >>> b.update(np.arange(4., 10.)[:, None])
+        >>> a.merge(b).mean, a.std
+        (array([4.5]), array([2.87228132]))
+        >>> c = MeanVarianceNormalizer.from_dict(a.to_dict())
+        >>> c.count, c.mean, c.std
+        (10, array([4.5]), array([2.87228132]))
+        """
+        if mode not in self.mode_choices:
+            raise ValueError(
+                f'Unknown mode {mode!r}. Choose from {self.mode_choices}.'
+            )
+        if mode == 'sliding':
+            assert isinstance(axis, int), (mode, axis)
+            assert window > 0, window
+        self.mode = mode
+        self.axis = axis
+        self.eps = eps
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """ Forget the accumulated statistics. """
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+
+    def _check_global(self):
+        assert self.mode == 'global', (
+            f'Statistics are only accumulated in the global mode, '
+            f'not in {self.mode!r}.'
+        )
+
+    def _combine(self, count, mean, m2):
+        # Chan et al., parallel variant of Welford's algorithm.
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count, self._mean, self._m2 = count, mean, m2
+            return
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * (count / total)
+        self._m2 = (
+            self._m2 + m2 + delta ** 2 * (self.count * count / total)
+        )
+        self.count = total
+
+    def update(self, data):
+        """ Accumulates the statistics of a chunk of data.
+
+        :param data: Any feature, the time dimensions are given by axis.
+        """
+        self._check_global()
+        data = np.asarray(data)
+        if data.size == 0:
+            return
+        mean = np.mean(data, axis=self.axis, keepdims=True, dtype=np.float64)
+        count = data.size // mean.size
+        m2 = np.sum(
+            np.square(data - mean), axis=self.axis, keepdims=True,
+            dtype=np.float64,
+        )
+        self._combine(count, mean, m2)
+
+    def merge(self, other):
+        """ Adds the statistics of another normalizer to this normalizer.
+
+        :param other: MeanVarianceNormalizer in the global mode.
+        :return: self
+        """
+        self._check_global()
+        other._check_global()
+        self._combine(other.count, other._mean, other._m2)
+        return self
+
+    @property
+    def mean(self):
+        self._check_global()
+        assert self.count > 0, 'No statistics, call update first.'
+        return np.squeeze(self._mean, axis=self.axis)
+
+    @property
+    def std(self):
+        self._check_global()
+        assert self.count > 0, 'No statistics, call update first.'
+        return np.sqrt(np.squeeze(self._m2, axis=self.axis) / self.count)
+
+    def to_dict(self):
+        """ Serializable (e.g. json) representation, see from_dict. """
+        return {
+            'mode': self.mode,
+            'axis': self.axis,
+            'eps': self.eps,
+            'window': self.window,
+            'count': self.count,
+            'mean': None if self._mean is None else self._mean.tolist(),
+            'm2': None if self._m2 is None else self._m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """ Inverse of to_dict. """
+        axis = d['axis']
+        if isinstance(axis, list):
+            axis = tuple(axis)
+        normalizer = cls(
+            mode=d['mode'], axis=axis, eps=d['eps'], window=d['window'])
+        if d['count'] > 0:
+            normalizer._combine(
+                d['count'], np.array(d['mean']), np.array(d['m2']))
+        return normalizer
+
+    def _sliding_statistics(self, data):
+        axis = self.axis % data.ndim
+        x = np.moveaxis(data, axis, 0).astype(np.float64)
+        frames = x.shape[0]
+        # Remove the utterance mean to reduce the cancellation in the
+        # difference of the cumulative sums.
+        offset = np.mean(x, axis=0)
+        x = x - offset
+
+        cumsum = np.zeros((frames + 1, *x.shape[1:]))
+        np.cumsum(x, axis=0, out=cumsum[1:])
+        cumsum_square = np.zeros((frames + 1, *x.shape[1:]))
+        np.cumsum(np.square(x), axis=0, out=cumsum_square[1:])
+
+        start = np.clip(
+            np.arange(frames) - self.window // 2, 0, max(frames - 1, 0))
+        stop = np.minimum(start + self.window, frames)
+        start = np.maximum(stop - self.window, 0)
+        count = (stop - start).reshape((-1,) + (1,) * (x.ndim - 1))
+
+        mean = (cumsum[stop] - cumsum[start]) / count
+        var = (cumsum_square[stop] - cumsum_square[start]) / count
+        var = np.maximum(var - np.square(mean), 0)
+        mean += offset
+        return (
+            np.moveaxis(mean, 0, axis),
+            np.moveaxis(np.sqrt(var), 0, axis),
+        )
+
+    def __call__(self, data, out=None):
+        """ Normalize features.
+
+        :param data: Any feature
+        :param out: Optional output array, e.g. data for an inplace
+            normalization.
+        :return: Normalized observation
+        """
+        data = np.asarray(data)
+        if self.mode == 'utterance':
+            mean = np.mean(data, axis=self.axis, keepdims=True)
+            std = np.std(data, axis=self.axis, keepdims=True)
+        elif self.mode == 'sliding':
+            mean, std = self._sliding_statistics(data)
+        else:
+            self._check_global()
+            assert self.count > 0, 'No statistics, call update first.'
+            mean = self._mean
+            std = np.sqrt(self._m2 / self.count)
+
+        dtype = np.result_type(data.dtype, np.float32)
+        if out is None:
+            out = np.empty(data.shape, dtype=dtype)
+        np.subtract(data, mean.astype(dtype, copy=False), out=out)
+        np.divide(out, (std + self.eps).astype(dtype, copy=False), out=out)
+        return out
@@ -1,31 +1,69 @@
-from copy import deepcopy
+import functools
 
 import numpy as np
-import paderbox.math.directional as directional
 
 
-def transform_to_baseband(X, size, shift):
+def transform_to_baseband(X, size, shift, time_axis=0, out=None):
     """Assumes linear frequency dependency.
 
     Then phase is more consistent over frequencies.
 
     Args:
-        X:
-        size:
-        shift:
+        X: Complex STFT signal. The time axis is `time_axis`, the frequency
+            axis is the last axis, e.g. (T, D, F) or (..., T, F).
+        size: FFT size of the STFT.
+        shift: Shift of the STFT.
+        time_axis: Axis of the frames. Has to be in front of the frequency
+            axis.
+        out: Optional output array. Use `out=X` for an inplace
+            transformation.
 
     Returns:
+        X multiplied with exp(-2j * pi * t * f * shift / size).
 
+    >>> X = np.ones((3, 2, 4), dtype=np.complex128)
+    >>> np.round(transform_to_baseband(X, size=6, shift=2)[:, 0, :], 3)
+    array([[ 1. +0.j   ,  1. +0.j   ,  1. +0.j   ,  1. +0.j   ],
+           [ 1. +0.j   , -0.5-0.866j, -0.5+0.866j,  1. +0.j   ],
+           [ 1. +0.j   , -0.5+0.866j, -0.5-0.866j,  1. +0.j   ]])
     """
-    X = deepcopy(X)
-    T, _, F = X.shape
-    for t in range(T):
-        for f in range(F):
-            X[t, :, f] *= np.exp(-2j * np.pi * t * f * shift / size)
-    return X
+    X = np.asarray(X)
+    time_axis = time_axis % X.ndim
+    assert time_axis < X.ndim - 1, (time_axis, X.shape)
+    T = X.shape[time_axis]
+    F = X.shape[-1]
 
+    # exp(-2j * pi * k / size) is periodic in k, hence all phasors are
+    # entries of a table with size entries.
+    index = (np.arange(T)[:, None] * (np.arange(F) * shift)) % size
+    phasor = _get_baseband_phasor_table(size)[index]
 
-def get_phase_features(X, size, shift):
+    shape = [1] * X.ndim
+    shape[time_axis] = T
+    shape[-1] = F
+    phasor = phasor.reshape(shape)
+
+    if out is None:
+        out = np.empty(X.shape, dtype=np.result_type(X.dtype, np.complex64))
+    return np.multiply(X, phasor, out=out)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_baseband_phasor_table(size):
+    table = np.exp(-2j * np.pi * np.arange(size) / size)
+    table.flags.writeable = False
+    return table
+
+
+def _wrap_inplace(angle):
+    """Inplace version of paderbox.math.directional.wrap for angles in the
+    range [-2 pi, 2 pi]."""
+    angle[angle > np.pi] -= 2 * np.pi
+    angle[angle < -np.pi] += 2 * np.pi
+    return angle
+
+
+def get_phase_features(X, size, shift, time_axis=0):
     """Experimental phase features for SPP estimation.
 
     These experimental features were originally used because the phase
@@ -33,17 +71,34 @@ def get_phase_features(X, size, shift):
     to SPP than the phase itself.
 
     Args:
-        X:
-        size:
-        shift:
+        X: Complex STFT signal, see transform_to_baseband.
+        size: FFT size of the STFT.
+        shift: Shift of the STFT.
+        time_axis: Axis of the frames, see transform_to_baseband.
 
     Returns:
+        The baseband phase, its wrapped difference along the time axis and
+        the difference of the difference. The first frame of the
+        differences is zero.
 
+    >>> X = np.exp(1j * np.random.uniform(-4, 4, size=(10, 2, 5)))
+    >>> phase, delta, delta_delta = get_phase_features(X, 8, 2)
+    >>> phase.shape, delta.shape, delta_delta.shape
+    ((10, 2, 5), (10, 2, 5), (10, 2, 5))
     """
-    X_base = transform_to_baseband(X, size, shift)
-    phase = np.angle(X_base)
-    delta = np.zeros_like(phase)
-    delta[1:, ...] = directional.minus(phase[1:, ...], phase[:-1, ...])
-    delta_delta = np.zeros_like(phase)
-    delta_delta[1:, ...] = delta[1:, ...] - delta[:-1, ...]
+    time_axis = time_axis % np.ndim(X)
+    phase = np.angle(transform_to_baseband(X, size, shift, time_axis))
+
+    def index(start, stop=None):
+        return (slice(None),) * time_axis + (slice(start, stop),)
+
+    delta = np.empty_like(phase)
+    delta[index(0, 1)] = 0
+    np.subtract(phase[index(1)], phase[index(None, -1)], out=delta[index(1)])
+    _wrap_inplace(delta[index(1)])
+
+    delta_delta = np.empty_like(phase)
+    delta_delta[index(0, 1)] = 0
+    np.subtract(
+        delta[index(1)], delta[index(None, -1)], out=delta_delta[index(1)])
     return phase, delta, delta_delta
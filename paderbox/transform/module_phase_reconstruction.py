@@ -1,17 +1,47 @@
 import numpy as np
+from paderbox.array import segment_axis
+from paderbox.transform.module_fft import get_fft_backend
 from paderbox.transform.module_stft import STFT
+from paderbox.transform.module_stft import _fading_pad_width
+from paderbox.transform.module_stft import _get_dtypes
+from paderbox.transform.module_stft import _overlap_add
 
 
-def griffin_lim(x, stft: STFT, iterations=100, verbose=False):
+def griffin_lim(
+        x,
+        stft: STFT,
+        iterations=100,
+        verbose=False,
+        *,
+        momentum=0.,
+        tolerance=None,
+):
     """
     Reconstructs phase from magnitudes using Griffin-Lim algorithm and returns
     audio signal in time domain.
 
+    By default (momentum=0) the classic algorithm is used. With momentum > 0
+    the fast Griffin-Lim algorithm [1] is used, that needs much less
+    iterations.
+
+    All leading axes are processed as a batch. The STFT and the inverse STFT
+    of the iterations reuse preallocated buffers and the windows of `stft`.
+
+    [1] Perraudin, N., Balazs, P., & Søndergaard, P. L. "A fast Griffin-Lim
+        algorithm", WASPAA 2013
+
     Args:
         x: STFT Magnitudes (..., T, F)
         stft:
-        iterations:
+        iterations: Maximum number of iterations.
         verbose:
+        momentum: Momentum of the fast Griffin-Lim algorithm. The default 0
+            is the classic algorithm. The recommended value for the fast
+            algorithm is 0.99 [1].
+        tolerance: None or the early stopping threshold. The iterations
+            stop, when the relative improvement of the spectral convergence
+            (i.e. ||x - |X||| / ||x|| with the STFT X of the reconstruction)
+            is below tolerance for all signals of the batch.
 
     Returns: audio signal
 
@@ -23,25 +53,105 @@ def griffin_lim(x, stft: STFT, iterations=100, verbose=False):
     >>> reconstruction = griffin_lim(np.abs(x), stft, iterations=5)
     >>> reconstruction.shape
     (8352,)
+    >>> griffin_lim(np.abs(np.stack([x, x])), stft, iterations=5).shape
+    (2, 8352)
     """
-    nframes = x.shape[-2]
-    nsamples = int(stft.frames_to_samples(nframes))
+    dtype, complex_dtype = _get_dtypes(stft._window_dtype)
+    x = np.asarray(x, dtype=dtype)
+    assert x.shape[-1] == stft.size // 2 + 1, (x.shape, stft.size)
+
+    *independent, frames, _ = x.shape
+    window_length = stft.window_length
+    shift = stft.shift
+    samples = frames * shift + window_length - shift
+    pad_begin, pad_end = _fading_pad_width(window_length, shift, stft.fading)
+
+    fft_backend = get_fft_backend(stft.fft_backend)
+    analysis_window = stft.analysis_window
+    synthesis_window = stft.synthesis_window
+
+    # Buffers for the iterations. The time signal is kept with the padding
+    # of the fading, hence it always has exactly `frames` frames.
+    time_signal = np.zeros((*independent, samples), dtype=dtype)
+    time_signal_seg = segment_axis(
+        time_signal, window_length, shift=shift, end=None)
+    frames_buffer = np.empty(
+        (*independent, frames, window_length), dtype=dtype)
+    angles = np.empty(x.shape, dtype=complex_dtype)
+    magnitude = np.empty(x.shape, dtype=dtype)
+
+    def analysis():
+        # Equal to stft(inverse(...)): The inverse STFT removes the fading
+        # and the STFT pads it again with zeros.
+        time_signal[..., :pad_begin] = 0
+        time_signal[..., samples - pad_end:] = 0
+        np.multiply(time_signal_seg, analysis_window, out=frames_buffer)
+        return fft_backend.rfft(frames_buffer, n=stft.size).astype(
+            complex_dtype, copy=False)
+
+    def synthesis(stft_signal):
+        np.multiply(
+            np.real(fft_backend.irfft(stft_signal))[..., :window_length],
+            synthesis_window,
+            out=frames_buffer,
+        )
+        time_signal[...] = 0
+        _overlap_add(frames_buffer, shift, out=time_signal)
+
+    def normalize(stft_signal, out):
+        # out = stft_signal / |stft_signal|
+        np.abs(stft_signal, out=magnitude)
+        np.divide(stft_signal, magnitude, out=out, where=magnitude > 0)
+        out[magnitude == 0] = 1
+
+    x_norm = None
+
+    def spectral_convergence(rebuilt):
+        nonlocal x_norm
+        if x_norm is None:
+            x_norm = np.maximum(
+                np.linalg.norm(x, axis=(-2, -1)), np.finfo(dtype).tiny)
+        np.abs(rebuilt, out=magnitude)
+        np.subtract(magnitude, x, out=magnitude)
+        return np.linalg.norm(magnitude, axis=(-2, -1)) / x_norm
+
     # Initialize the reconstructed signal.
-    audio = np.random.randn(nsamples)
+    time_signal[..., pad_begin:samples - pad_end] = np.random.randn(
+        *independent, samples - pad_begin - pad_end)
+    previous = np.zeros(x.shape, dtype=complex_dtype)
+
+    last_convergence = None
     for n in range(iterations):
-        reconstruction_stft = stft(audio)
-        reconstruction_angle = np.angle(reconstruction_stft)
+        rebuilt = analysis()
+
+        # angles = rebuilt - momentum / (1 + momentum) * previous
+        np.multiply(previous, -momentum / (1 + momentum), out=angles)
+        angles += rebuilt
+        previous = rebuilt
+
+        converged = False
+        if verbose or tolerance is not None:
+            convergence = spectral_convergence(rebuilt)
+            if verbose:
+                print(
+                    'Reconstruction iteration: {}/{} spectral convergence: {} '
+                    .format(n, iterations, convergence)
+                )
+            if tolerance is not None and last_convergence is not None:
+                improvement = (
+                    (last_convergence - convergence)
+                    / np.maximum(last_convergence, np.finfo(dtype).tiny)
+                )
+                converged = np.all(improvement < tolerance)
+            last_convergence = convergence
+
         # Discard magnitude part of the reconstruction and use the supplied
         # magnitude spectrogram instead.
-        proposal_spec = x * np.exp(1.0j * reconstruction_angle)
-        audio = stft.inverse(proposal_spec)
-
-        if verbose:
-            reconstruction_magnitude = np.abs(reconstruction_stft)
-            diff = (np.sqrt(np.mean((reconstruction_magnitude - x) ** 2)))
-            print(
-                'Reconstruction iteration: {}/{} RMSE: {} '.format(
-                    n, iterations, diff
-                )
-            )
-    return audio
+        normalize(angles, out=angles)
+        np.multiply(angles, x, out=angles)
+        synthesis(angles)
+        if converged:
+            break
+
+    # Remove the fading, see istft.
+    return time_signal[..., pad_begin:samples - pad_end].copy()
@@ -1,6 +1,8 @@
 """
 This module contains resampling methods.
 """
+import functools
+import math
 import subprocess
 import numpy as np
 
@@ -130,4 +132,128 @@ def resample_sox(signal: np.ndarray, *, in_rate, out_rate):
 
     return signal_resampled / normalizer
 
+
+# Bandwidth (relative to the Nyquist frequency of the lower rate) and
+# stopband attenuation in dB of the anti-aliasing filter. The values follow
+# the quality options of the SoX rate effect (-l, -m, -h, -v).
+_resample_qualities = {
+    'low': (0.80, 96),
+    'medium': (0.95, 96),
+    'high': (0.95, 125),
+    'very high': (0.95, 175),
+    # Default of SoX (rate -h), which is used by resample_sox.
+    'sox': (0.95, 125),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _get_resample_filter(up, down, quality):
+    """Designs the linear phase anti-aliasing filter for the polyphase
+    resampling with the factor up / down.
+
+    The filter is a Kaiser windowed sinc. Its passband ends at the given
+    bandwidth and the stopband starts at the Nyquist frequency of the lower
+    rate (i.e. no aliasing).
+
+    >>> _get_resample_filter(1, 2, 'high').shape
+    (655,)
+    """
+    import scipy.signal
+    bandwidth, attenuation = _resample_qualities[quality]
+    max_rate = max(up, down)
+    # Relative to the Nyquist frequency of the upsampled signal.
+    width = (1 - bandwidth) / max_rate
+    cutoff = (1 + bandwidth) / 2 / max_rate
+    numtaps, beta = scipy.signal.kaiserord(attenuation, width)
+    # An odd length yields an integer group delay.
+    numtaps += 1 - numtaps % 2
+    h = scipy.signal.firwin(numtaps, cutoff, window=('kaiser', beta))
+    h.flags.writeable = False
+    return h
+
+
+def resample_polyphase(
+        signal: np.ndarray, *, in_rate, out_rate, quality='sox', axis=-1
+):
+    """Resample with a polyphase FIR filter in the current process.
+
+    An alternative to resample_sox without the sox subprocess. The
+    anti-aliasing filters are designed once for each
+    (in_rate, out_rate, quality) and cached. The delay of the filter is
+    compensated, i.e. the output has ceil(samples * out_rate / in_rate)
+    samples and is aligned with the input.
+
+    >>> signal = np.array([1, -1, 1, -1], dtype=np.float32)
+    >>> resample_polyphase(signal, in_rate=1, out_rate=1)
+    array([ 1., -1.,  1., -1.], dtype=float32)
+
+    >>> signal = np.random.normal(size=(2, 30))
+    >>> a = resample_polyphase(signal[0], in_rate=1, out_rate=2)
+    >>> b = resample_polyphase(signal[1], in_rate=1, out_rate=2)
+    >>> c = resample_polyphase(signal, in_rate=1, out_rate=2)
+    >>> np.testing.assert_allclose([a, b], c)
+    >>> c.shape
+    (2, 60)
+
+    A sine far below the Nyquist frequency is preserved:
+
+    >>> t = np.arange(16000)
+    >>> x = np.sin(2 * np.pi * 440 * t / 16000)
+    >>> y = resample_polyphase(x, in_rate=16000, out_rate=8000)
+    >>> t = np.arange(8000)
+    >>> np.abs(y - np.sin(2 * np.pi * 440 * t / 8000))[200:-200].max() < 1e-8
+    True
+
+    The quality 'sox' is close to resample_sox, e.g. the values from the
+    doctest of resample_sox:
+
+    >>> signal = np.array([1, -1, 1, -1], dtype=np.float32)
+    >>> np.testing.assert_allclose(
+    ...     resample_polyphase(signal, in_rate=2, out_rate=1),
+    ...     np.array([0.28615332, -0.13513082], dtype=np.float32),
+    ...     atol=2e-3,
+    ... )
+
+    Args:
+        signal: Signal with arbitrary shape, e.g. (..., channels, samples).
+        in_rate: Sample rate of the signal. Integer (or a float with an
+            exact rational representation of the ratio).
+        out_rate: Sample rate of the output.
+        quality: One of 'low', 'medium', 'high', 'very high' (see the
+            corresponding options of the SoX rate effect) or 'sox', the
+            default quality of SoX, which is used by resample_sox.
+        axis: The time axis.
+
+    Returns:
+        Resampled signal. Floating point signals keep their dtype.
+    """
+    import scipy.signal
+    signal = np.asarray(signal)
+    if quality not in _resample_qualities:
+        raise ValueError(
+            f'Unknown quality {quality!r}. '
+            f'Choose from {list(_resample_qualities)}.'
+        )
+
+    up, down = out_rate, in_rate
+    if up != int(up) or down != int(down):
+        from fractions import Fraction
+        ratio = Fraction(out_rate).limit_denominator() \
+            / Fraction(in_rate).limit_denominator()
+        up, down = ratio.numerator, ratio.denominator
+    up, down = int(up), int(down)
+    gcd = math.gcd(up, down)
+    up, down = up // gcd, down // gcd
+
+    if up == down:
+        return signal.copy()
+
+    h = _get_resample_filter(up, down, quality)
+    signal_resampled = scipy.signal.resample_poly(
+        signal, up, down, axis=axis, window=h)
+    if np.issubdtype(signal.dtype, np.floating):
+        signal_resampled = signal_resampled.astype(signal.dtype, copy=False)
+    return signal_resampled
+
+
 resample = resample_sox
@@ -1,17 +1,18 @@
 """
 This file contains the STFT function and related helper functions.
 """
+import functools
 import string
 import typing
 from math import ceil
 
 import numpy as np
-from numpy.fft import rfft, irfft
 from scipy import signal
 
 from paderbox.array import roll_zeropad
 from paderbox.array import segment_axis
 from paderbox.utils.mapping import Dispatcher
+from paderbox.transform.module_fft import get_fft_backend
 
 
 def stft(
@@ -25,6 +26,9 @@ def stft(
         fading: typing.Optional[typing.Union[bool, str]] = 'full',
         pad: bool = True,
         symmetric_window: bool = False,
+        chunk_size: int = None,
+        fft_backend=None,
+        dtype=None,
 ) -> np.array:
     """
     ToDo: Open points:
@@ -54,16 +58,91 @@ def stft(
         periodic. Since the implementation of the windows in scipy.signal have a
         curious behaviour for odd window_length. Use window(len+1)[:-1]. Since
         is equal to the behaviour of MATLAB.
+    :param chunk_size: None or the number of frames that are windowed and
+        transformed at once. When given, the frames are processed in chunks
+        and written to a preallocated output, hence the peak memory is the
+        output size plus the memory for one chunk. The result is identical.
+    :param fft_backend: None, name or object of the FFT backend.
+        See paderbox.transform.module_fft.
+    :param dtype: None or the floating point precision of the computation,
+        e.g. np.float32 (np.complex64 is equivalent). With np.float32 the
+        signal and the window are single precision and the output is
+        complex64. Backends that support single precision FFTs (scipy,
+        pyfftw) compute the FFT in single precision. Compared to the double
+        precision result, the absolute error is below 1e-5 times the
+        largest magnitude of the STFT.
+        None keeps the old behaviour (usually complex128).
     :return: Single channel complex STFT signal with dimensions
         AA x ... x AZ x T' times size/2+1 times BA x ... x BZ.
+
+    >>> x = np.random.normal(size=(2, 1000))
+    >>> np.testing.assert_equal(stft(x, 64, 16, chunk_size=7), stft(x, 64, 16))
+    >>> stft(x, 64, 16, dtype=np.float32).dtype
+    dtype('complex64')
+    """
+    time_signal_seg, window, axis = _stft_segments(
+        time_signal, shift, axis=axis, window=window,
+        window_length=size if window_length is None else window_length,
+        fading=fading, pad=pad, symmetric_window=symmetric_window,
+        dtype=dtype,
+    )
+    if dtype is not None:
+        dtype, complex_dtype = _get_dtypes(dtype)
+
+    rfft = get_fft_backend(fft_backend).rfft
+
+    if chunk_size is not None:
+        return _stft_chunked(
+            time_signal_seg, window, size=size, axis=axis,
+            chunk_size=chunk_size, rfft=rfft,
+            dtype=np.complex128 if dtype is None else complex_dtype,
+        )
+
+    letters = string.ascii_lowercase[:time_signal_seg.ndim]
+    mapping = letters + ',' + letters[axis + 1] + '->' + letters
+
+    try:
+        # ToDo: Implement this more memory efficient
+        stft_signal = rfft(
+            np.einsum(mapping, time_signal_seg, window),
+            n=size,
+            axis=axis + 1,
+        )
+    except ValueError as e:
+        raise ValueError(
+            f'Could not calculate the stft, something does not match.\n'
+            f'mapping: {mapping}, '
+            f'time_signal_seg.shape: {time_signal_seg.shape}, '
+            f'window.shape: {window.shape}, '
+            f'size: {size}'
+            f'axis+1: {axis+1}'
+        ) from e
+
+    if dtype is not None:
+        # The numpy backend always computes in double precision.
+        stft_signal = stft_signal.astype(complex_dtype, copy=False)
+    return stft_signal
+
+
+def _stft_segments(
+        time_signal, shift, axis, window, window_length, fading, pad,
+        symmetric_window, dtype,
+):
+    """Pads the signal for the fading and splits it into (unwindowed) frames.
+
+    Returns:
+        time_signal_seg: Segmented time signal, frames are on axis `axis`,
+            the samples of each frame on axis `axis + 1`.
+        window: The analysis window.
+        axis: The non negative frame axis.
     """
     time_signal = np.asarray(time_signal)
+    if dtype is not None:
+        dtype, _ = _get_dtypes(dtype)
+        time_signal = time_signal.astype(dtype, copy=False)
 
     axis = axis % time_signal.ndim
 
-    if window_length is None:
-        window_length = size
-
     # Pad with zeros to have enough samples for the window function to fade.
     assert fading in [None, True, False, 'full', 'half'], fading
     if fading not in [False, None]:
@@ -80,6 +159,8 @@ def stft(
         symmetric_window=symmetric_window,
         window_length=window_length,
     )
+    if dtype is not None:
+        window = window.astype(dtype, copy=False)
 
     time_signal_seg = segment_axis(
         time_signal,
@@ -88,26 +169,222 @@ def stft(
         axis=axis,
         end='pad' if pad else 'cut'
     )
+    return time_signal_seg, window, axis
 
-    letters = string.ascii_lowercase[:time_signal_seg.ndim]
-    mapping = letters + ',' + letters[axis + 1] + '->' + letters
 
-    try:
-        # ToDo: Implement this more memory efficient
-        return rfft(
-            np.einsum(mapping, time_signal_seg, window),
+def _get_dtypes(dtype):
+    """Returns the real and the complex dtype for a floating point precision.
+
+    >>> _get_dtypes(np.float32)
+    (dtype('float32'), dtype('complex64'))
+    >>> _get_dtypes(np.complex128)
+    (dtype('float64'), dtype('complex128'))
+    """
+    dtype = np.finfo(dtype).dtype
+    return dtype, np.result_type(dtype, np.complex64)
+
+
+def _stft_chunked(
+        time_signal_seg, window, size, axis, chunk_size, rfft,
+        dtype=np.complex128, transform=None, out=None,
+):
+    """Low memory variant of the windowing and the rfft in stft.
+
+    Avoids the windowed copy of all frames. Instead, the frames are windowed
+    and transformed in chunks of chunk_size frames and written into one
+    preallocated output.
+
+    Args:
+        time_signal_seg: Segmented time signal, frames are on axis `axis`,
+            the samples of each frame on axis `axis + 1`.
+        window: 1D window with length time_signal_seg.shape[axis + 1].
+        size: FFT size.
+        axis: Frame axis.
+        chunk_size: Number of frames that are processed at once.
+        rfft: rfft function of the FFT backend.
+        dtype: Complex dtype of the rfft output.
+        transform: None or a function that is applied to each chunk of the
+            STFT, e.g. the power spectrum. It may change the length of
+            the axes behind the frame axis and the dtype. Only the output of
+            the transform is kept, the complex chunk is discarded.
+        out: None or the preallocated output.
+
+    Returns:
+        STFT signal with shape of time_signal_seg, where the axis `axis + 1`
+        has the length size // 2 + 1, or the concatenated outputs of
+        `transform`.
+    """
+    assert chunk_size > 0, chunk_size
+    window = window.reshape(
+        [window.shape[0]] + [1] * (time_signal_seg.ndim - axis - 2))
+
+    frames = time_signal_seg.shape[axis]
+    if out is not None:
+        stft_signal = out
+    elif transform is None:
+        shape = list(time_signal_seg.shape)
+        shape[axis + 1] = size // 2 + 1
+        stft_signal = np.empty(shape, dtype=dtype)
+    else:
+        # The shape and dtype are known after the first chunk.
+        stft_signal = None
+
+    # Process at least one (maybe empty) chunk to obtain the output shape.
+    for start in range(0, max(frames, 1), chunk_size):
+        index = (slice(None),) * axis + (slice(start, start + chunk_size),)
+        chunk = rfft(
+            time_signal_seg[index] * window,
             n=size,
             axis=axis + 1,
         )
-    except ValueError as e:
-        raise ValueError(
-            f'Could not calculate the stft, something does not match.\n'
-            f'mapping: {mapping}, '
-            f'time_signal_seg.shape: {time_signal_seg.shape}, '
-            f'window.shape: {window.shape}, '
-            f'size: {size}'
-            f'axis+1: {axis+1}'
-        ) from e
+        if transform is not None:
+            chunk = transform(chunk.astype(dtype, copy=False))
+            if stft_signal is None:
+                shape = list(chunk.shape)
+                shape[axis] = frames
+                stft_signal = np.empty(shape, dtype=chunk.dtype)
+        stft_signal[index] = chunk
+    return stft_signal
+
+
+def _fading_pad_width(window_length, shift, fading):
+    """Returns the number of zeros that the offline STFT adds at the begin
+    and the end of the signal.
+
+    >>> _fading_pad_width(16, 4, 'full')
+    (12, 12)
+    >>> _fading_pad_width(16, 4, 'half')
+    (6, 6)
+    >>> _fading_pad_width(16, 4, False)
+    (0, 0)
+    """
+    assert fading in [None, True, False, 'full', 'half'], fading
+    if fading in [False, None]:
+        return 0, 0
+    elif fading == 'half':
+        return (window_length - shift) // 2, ceil((window_length - shift) / 2)
+    else:
+        return window_length - shift, window_length - shift
+
+
+def batch_stft(
+        time_signals,
+        size: int = 1024,
+        shift: int = 256,
+        *,
+        window: [str, typing.Callable] = signal.windows.blackman,
+        window_length: int = None,
+        fading: typing.Optional[typing.Union[bool, str]] = 'full',
+        pad: bool = True,
+        symmetric_window: bool = False,
+        fft_backend=None,
+        dtype=None,
+        return_list: bool = False,
+):
+    """
+    Calculates the STFT of a list of signals with different lengths in one
+    vectorized call.
+
+    The signals are packed into one zero padded buffer and transformed at
+    once. This avoids the per call overhead of stft, which dominates for
+    many short signals. The frames of each signal are identical to the
+    frames of stft on that signal.
+
+    :param time_signals: List of time signals with dimensions ... x T_b.
+        The time axis is the last axis, the other dimensions have to match.
+    :param size: See stft.
+    :param shift: See stft.
+    :param window: See stft.
+    :param window_length: See stft.
+    :param fading: See stft.
+    :param pad: See stft.
+    :param symmetric_window: See stft.
+    :param fft_backend: See stft.
+    :param dtype: See stft.
+    :param return_list: If True, return a list with the STFT of each signal
+        (views to the padded STFT). Else return the padded STFT and the
+        number of frames of each signal.
+    :return: If return_list is False, a tuple of the padded STFT with
+        dimensions B x ... x T'_max x size/2+1 and an array with the number
+        of frames of each signal. Else a list of STFT signals with
+        dimensions ... x T'_b x size/2+1.
+
+    >>> time_signals = [np.ones(1000), np.ones(300), np.ones(650)]
+    >>> stft_signal, frames = batch_stft(time_signals, 256, 64)
+    >>> stft_signal.shape
+    (3, 19, 129)
+    >>> frames
+    array([19,  8, 14])
+    >>> [s.shape for s in batch_stft(time_signals, 256, 64, return_list=True)]
+    [(19, 129), (8, 129), (14, 129)]
+    >>> np.testing.assert_equal(stft_signal[1, :8], stft(np.ones(300), 256, 64))
+    """
+    time_signals = [np.asarray(time_signal) for time_signal in time_signals]
+    assert len(time_signals) > 0, time_signals
+
+    independent = {time_signal.shape[:-1] for time_signal in time_signals}
+    assert len(independent) == 1, (
+        'All signals need the same shape except for the last (time) axis.',
+        [time_signal.shape for time_signal in time_signals],
+    )
+    independent, = independent
+
+    if window_length is None:
+        window_length = size
+
+    num_samples = [time_signal.shape[-1] for time_signal in time_signals]
+    frames = np.array([
+        _samples_to_stft_frames(
+            samples, window_length, shift, pad=pad, fading=fading)
+        for samples in num_samples
+    ])
+    # segment_axis pads signals, that are shorter than one frame, to one frame
+    frames = np.maximum(frames, 1 if pad else 0)
+
+    # Pack the signals with the fading zeros into one buffer, hence stft
+    # does not need to pad again.
+    pad_width = _fading_pad_width(window_length, shift, fading)
+
+    if dtype is None:
+        buffer_dtype = np.result_type(*time_signals, np.float64)
+    else:
+        buffer_dtype = _get_dtypes(dtype)[0]
+
+    length = sum(pad_width) + max(num_samples)
+    if pad:
+        # Avoid the copy in segment_axis for the padding of the last frame.
+        length = max(length, _stft_frames_to_samples(
+            max(frames), window_length, shift))
+
+    buffer = np.zeros(
+        (len(time_signals), *independent, length),
+        dtype=buffer_dtype,
+    )
+    for time_signal, buffer_item in zip(time_signals, buffer):
+        buffer_item[..., pad_width[0]:pad_width[0] + time_signal.shape[-1]] \
+            = time_signal
+
+    stft_signal = stft(
+        buffer,
+        size=size,
+        shift=shift,
+        axis=-1,
+        window=window,
+        window_length=window_length,
+        fading=False,
+        pad=pad,
+        symmetric_window=symmetric_window,
+        fft_backend=fft_backend,
+        dtype=dtype,
+    )
+
+    if return_list:
+        return [
+            stft_item[..., :frames_item, :]
+            for stft_item, frames_item in zip(stft_signal, frames)
+        ]
+    else:
+        return stft_signal, frames
 
 
 def stft_with_kaldi_dimensions(
@@ -174,8 +451,11 @@ _window_dispatcher = Dispatcher({
 def _get_window(window, symmetric_window, window_length):
     """Returns the window.
 
+    The windows are cached (see _get_window_cached), hence the returned
+    array is read only.
+
     Args:
-        window: callable or str
+        window: callable, str or 1D array. An array is returned as it is.
         symmetric_window:
         window_length:
 
@@ -186,8 +466,26 @@ def _get_window(window, symmetric_window, window_length):
     array([0. , 0.5, 1. , 0.5])
     >>> _get_window('hann', True, 4)  # uncommon stft window, common for filter
     array([0.  , 0.75, 0.75, 0.  ])
+    >>> _get_window(np.ones(4), False, 4)
+    array([1., 1., 1., 1.])
     """
+    if isinstance(window, np.ndarray):
+        assert window.shape == (window_length,), (window.shape, window_length)
+        return window
+    elif isinstance(window, typing.Hashable):
+        return _get_window_cached(window, symmetric_window, window_length)
+    else:
+        return _calculate_window(window, symmetric_window, window_length)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_window_cached(window, symmetric_window, window_length):
+    window = _calculate_window(window, symmetric_window, window_length)
+    window.setflags(write=False)
+    return window
 
+
+def _calculate_window(window, symmetric_window, window_length):
     if callable(window):
         pass
     elif isinstance(window, str):
@@ -216,7 +514,8 @@ def _samples_to_stft_frames(
     Calculates number of STFT frames from number of samples in time domain.
 
     Args:
-        samples: Number of samples in time domain.
+        samples: Number of samples in time domain. May be an array, then the
+            result is an int64 array with the results of the scalar version.
         size: FFT size.
             window_length often equal to FFT size. The name size should be
             marked as deprecated and replaced with window_length.
@@ -263,6 +562,9 @@ def _samples_to_stft_frames(
     3
     >>> stft(np.zeros(21), 16, 3, fading=None).shape
     (3, 9)
+
+    >>> _samples_to_stft_frames(np.array([19, 20, 21]), 16, 4)
+    array([2, 2, 3])
     """
 
     assert fading in [None, True, False, 'full', 'half'], fading
@@ -270,6 +572,19 @@ def _samples_to_stft_frames(
         pad_width = (size - shift)
         samples = samples + (1 + (fading != 'half')) * pad_width
 
+    if np.ndim(samples) != 0:
+        numerator = np.asarray(samples) - size + shift
+        if np.issubdtype(numerator.dtype, np.integer):
+            # Integer arithmetic, that is exact for large values.
+            if pad:
+                return -(-numerator // shift)
+            # int truncates towards zero.
+            return np.sign(numerator) * (np.abs(numerator) // shift)
+        frames = numerator / shift
+        if pad:
+            return np.ceil(frames).astype(np.int64)
+        return np.trunc(frames).astype(np.int64)
+
     # I changed this from np.ceil to math.ceil, to yield an integer result.
     frames = (samples - size + shift) / shift
     if pad:
@@ -282,7 +597,7 @@ def _stft_frames_to_samples(
 ):
     """
     Calculates samples in time domain from STFT frames
-    :param frames: Number of STFT frames.
+    :param frames: Number of STFT frames. May be an array.
     :param size: window_length often equal to FFT size.
                  The name size should be marked as deprecated and replaced with
                  window_length.
@@ -291,7 +606,11 @@ def _stft_frames_to_samples(
 
     >>> _stft_frames_to_samples(2, 16, 4)
     20
+    >>> _stft_frames_to_samples(np.array([1, 2]), 16, 4, fading='full')
+    array([-8, -4])
     """
+    if np.ndim(frames) != 0:
+        frames = np.asarray(frames)
     samples = frames * shift + size - shift
 
     assert fading in [None, True, False, 'full', 'half'], fading
@@ -305,7 +624,7 @@ def sample_index_to_stft_frame_index(sample, window_length, shift, fading='full'
     """
     Calculates the best frame index for a given sample index
 
-    :param sample: Sample index in time domain.
+    :param sample: Sample index in time domain. May be an integer array.
     :param size: FFT size.
     :param shift: Hop in samples.
     :return: Best STFT frame index.
@@ -356,9 +675,16 @@ def sample_index_to_stft_frame_index(sample, window_length, shift, fading='full'
     (15, 5)
     >>> stft(np.zeros([8]), size=8, shift=4).shape
     (3, 5)
+
+    >>> sample_index_to_stft_frame_index(np.arange(10), 7, 2, fading='full')
+    array([3, 3, 3, 3, 4, 4, 5, 5, 6, 6])
     """
 
-    if (window_length + 1) // 2 > sample:
+    if np.ndim(sample) != 0:
+        # For samples below (window_length + 1) // 2 the term is <= 0.
+        frame = np.maximum(
+            (np.asarray(sample) - (window_length + 1) // 2) // shift + 1, 0)
+    elif (window_length + 1) // 2 > sample:
         frame = 0
     else:
         frame = (sample - (window_length + 1) // 2) // shift + 1
@@ -373,6 +699,34 @@ def sample_index_to_stft_frame_index(sample, window_length, shift, fading='full'
     return frame
 
 
+def _stft_frame_index_to_sample_index(
+        frame, window_length, shift, fading='full'
+):
+    """
+    Inverse of sample_index_to_stft_frame_index: Calculates the first sample
+    index, whose best frame index is larger or equal to frame.
+
+    >>> sample = np.arange(20)
+    >>> sample_index_to_stft_frame_index(sample, 7, 2)
+    array([ 3,  3,  3,  3,  4,  4,  5,  5,  6,  6,  7,  7,  8,  8,  9,  9, 10,
+           10, 11, 11])
+    >>> _stft_frame_index_to_sample_index(np.arange(12), 7, 2)
+    array([ 0,  0,  0,  0,  4,  6,  8, 10, 12, 14, 16, 18])
+    """
+    assert fading in [None, True, False, 'full', 'half'], fading
+    if fading not in [None, False]:
+        pad_width = (window_length - shift)
+        if fading == 'half':
+            pad_width //= 2
+        frame = frame - ceil(pad_width / shift)
+
+    # sample_index_to_stft_frame_index maps the samples
+    # (window_length + 1) // 2 + (frame - 1) * shift + [0, shift) to frame
+    # and all samples before to frame 0.
+    return np.where(
+        frame > 0, (window_length + 1) // 2 + (frame - 1) * shift, 0)
+
+
 def _biorthogonal_window_loopy(analysis_window, shift):
     """
     This version of the synthesis calculation is as close as possible to the
@@ -484,6 +838,107 @@ def _biorthogonal_window_brute_force(analysis_window, shift,
 _biorthogonal_window_fastest = _biorthogonal_window_brute_force
 
 
+def _get_synthesis_window(window, symmetric_window, window_length, shift):
+    """Returns the synthesis window for the istft.
+
+    The synthesis windows are cached in an LRU cache with the key
+    (window, symmetric_window, window_length, shift), hence the returned
+    array is read only.
+
+    Args:
+        window: callable, str or 1D array of the analysis window.
+        symmetric_window:
+        window_length:
+        shift:
+
+    Returns:
+        1D Array of length window_length.
+
+    >>> _get_synthesis_window('hann', False, 4, 2)
+    array([0., 1., 1., 1.])
+    """
+    if isinstance(window, typing.Hashable) \
+            and not isinstance(window, np.ndarray):
+        return _get_synthesis_window_cached(
+            window, symmetric_window, window_length, shift)
+    else:
+        return _biorthogonal_window_fastest(
+            _get_window(window, symmetric_window, window_length), shift)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_synthesis_window_cached(
+        window, symmetric_window, window_length, shift
+):
+    window = _biorthogonal_window_fastest(
+        _get_window(window, symmetric_window, window_length), shift)
+    window.setflags(write=False)
+    return window
+
+
+def _overlap_add(frames, shift, out=None):
+    """Overlap-add of frames with a given shift.
+
+    Vectorized replacement for an unbuffered `np.add.at` on a
+    `segment_axis` view. When the frame length is a multiple of the shift,
+    the frames are reshaped to blocks of `shift` samples and each block
+    offset is added with one vectorized operation. Otherwise the frames are
+    zero padded to the next multiple of the shift.
+
+    The frames are added in increasing order, hence the result is identical
+    to `np.add.at`.
+
+    Args:
+        frames: Array with shape (..., frames, frame_length).
+        shift: Hop in samples.
+        out: Optional array with shape
+            (..., frames * shift + frame_length - shift). When given, the
+            frames are added to `out`.
+
+    Returns:
+        Array with shape (..., frames * shift + frame_length - shift).
+
+    >>> _overlap_add(np.ones((3, 4)), 2)
+    array([1., 1., 2., 2., 2., 2., 1., 1.])
+    >>> _overlap_add(np.ones((3, 3)), 2)
+    array([1., 1., 2., 1., 2., 1., 1.])
+    """
+    *independent, num_frames, frame_length = frames.shape
+    num_samples = num_frames * shift + frame_length - shift
+    blocks_per_frame = -(-frame_length // shift)
+
+    if out is None:
+        out = np.zeros((*independent, num_samples), dtype=frames.dtype)
+    assert out.shape == (*independent, num_samples), (out.shape, frames.shape)
+
+    if frame_length % shift == 0:
+        buffer = out
+    else:
+        frames = np.pad(
+            frames,
+            [(0, 0)] * (frames.ndim - 1)
+            + [(0, blocks_per_frame * shift - frame_length)],
+            mode='constant',
+        )
+        buffer = np.zeros(
+            (*independent, (num_frames + blocks_per_frame - 1) * shift),
+            dtype=out.dtype,
+        )
+        buffer[..., :num_samples] = out
+
+    buffer_seg = segment_axis(buffer, shift, shift, end=None)
+    frames = frames.reshape(*independent, num_frames, blocks_per_frame, shift)
+
+    # Reversed order, that each sample accumulates the frames in increasing
+    # order (the same order as np.add.at).
+    for block in reversed(range(blocks_per_frame)):
+        buffer_seg[..., block:block + num_frames, :] += frames[..., block, :]
+
+    if buffer is not out:
+        out[...] = buffer[..., :num_samples]
+    return out
+
+
 def istft(
         stft_signal,
         size: int=1024,
@@ -495,6 +950,8 @@ def istft(
         symmetric_window: bool=False,
         num_samples: int=None,
         pad: bool=True,
+        fft_backend=None,
+        dtype=None,
 ):
     """
     Calculated the inverse short time Fourier transform to exactly reconstruct
@@ -525,47 +982,81 @@ def istft(
     :param pad: Necessary when num_samples is not None. This arguments is only
         for the forward transform nessesary and not for the inverse.
         Here it is used, to check that num_samples is valid.
+    :param fft_backend: None, name or object of the FFT backend.
+        See paderbox.transform.module_fft.
+    :param dtype: None or the floating point precision of the computation,
+        e.g. np.float32. With np.float32 the output is float32 and the
+        absolute reconstruction error of stft and istft is below 1e-5 times
+        the largest magnitude of the signal. See stft.
+        None keeps the old behaviour (float64).
 
     :return: Single channel complex STFT signal
     :return: Single channel time signal.
     """
-    # Note: frame_axis and frequency_axis would make this function much more
-    #       complicated
-    stft_signal = np.array(stft_signal)
-
-    assert stft_signal.shape[-1] == size // 2 + 1, str(stft_signal.shape)
-
     if window_length is None:
         window_length = size
 
-    window = _get_window(
+    window = _get_synthesis_window(
         window=window,
         symmetric_window=symmetric_window,
         window_length=window_length,
+        shift=shift,
     )
 
-    window = _biorthogonal_window_fastest(window, shift)
-
     # window = _biorthogonal_window_fastest(
     #     window, shift, use_amplitude_for_biorthogonal_window)
     # if disable_sythesis_window:
     #     window = np.ones_like(window)
 
-    time_signal = np.zeros(
-        (*stft_signal.shape[:-2],
-         stft_signal.shape[-2] * shift + window_length - shift))
-
-    # Get the correct view to time_signal
-    time_signal_seg = segment_axis(
-        time_signal, window_length, shift, end=None
+    return _istft(
+        stft_signal,
+        synthesis_window=window,
+        size=size,
+        shift=shift,
+        fading=fading,
+        num_samples=num_samples,
+        pad=pad,
+        fft_backend=fft_backend,
+        dtype=dtype,
     )
 
-    # Unbuffered inplace add
-    np.add.at(
-        time_signal_seg,
-        ...,
-        window * np.real(irfft(stft_signal))[..., :window_length]
-    )
+
+def _istft(
+        stft_signal,
+        synthesis_window,
+        size,
+        shift,
+        fading,
+        num_samples,
+        pad,
+        fft_backend,
+        dtype=None,
+):
+    """istft with a precomputed synthesis window. See istft for the
+    arguments.
+    """
+    # Note: frame_axis and frequency_axis would make this function much more
+    #       complicated
+    if dtype is None:
+        stft_signal = np.array(stft_signal)
+    else:
+        dtype, complex_dtype = _get_dtypes(dtype)
+        stft_signal = np.array(stft_signal, dtype=complex_dtype)
+
+    assert stft_signal.shape[-1] == size // 2 + 1, str(stft_signal.shape)
+
+    window = synthesis_window
+    window_length = window.shape[-1]
+
+    irfft = get_fft_backend(fft_backend).irfft
+
+    frames = np.real(irfft(stft_signal))[..., :window_length]
+    if dtype is not None:
+        # The numpy backend always computes in double precision.
+        frames = frames.astype(dtype, copy=False)
+        window = window.astype(dtype, copy=False)
+
+    time_signal = _overlap_add(window * frames, shift)
     # The [..., :window_length] is the inverse of the window padding in rfft.
 
     # Compensate fade-in and fade-out
@@ -609,15 +1100,77 @@ def stft_to_spectrogram(stft_signal):
     return spectrogram
 
 
-def spectrogram(time_signal, *args, **kwargs):
+def spectrogram(
+        time_signal,
+        size: int = 1024,
+        shift: int = 256,
+        *,
+        axis=-1,
+        window: [str, typing.Callable] = signal.windows.blackman,
+        window_length: int = None,
+        fading: typing.Optional[typing.Union[bool, str]] = 'full',
+        pad: bool = True,
+        symmetric_window: bool = False,
+        chunk_size: int = None,
+        transform: typing.Callable = None,
+        fft_backend=None,
+        dtype=None,
+):
     """ Thin wrapper of stft with power spectrum calculation.
 
-    :param time_signal:
-    :param args:
-    :param kwargs:
-    :return:
+    When chunk_size is given, the STFT and the power spectrum are calculated
+    chunk by chunk, i.e. the complex STFT of the whole signal is never
+    materialized. The peak memory is then the size of the output plus the
+    memory for one chunk.
+
+    See stft for the parameters.
+
+    :param chunk_size: None or the number of frames that are processed at
+        once.
+    :param transform: None or a function that is applied to the power
+        spectrum, e.g. a MelTransform. With chunk_size, it is applied to each
+        chunk, hence it has to operate frame wise. The frequency axis is
+        behind the frame axis, i.e. for axis=-1 it is the last axis.
+    :return: Real power spectrum with the shape of the STFT or the output
+        of transform.
+
+    >>> x = np.random.normal(size=(2, 1000))
+    >>> np.testing.assert_equal(
+    ...     spectrogram(x, 64, 16, chunk_size=7),
+    ...     stft_to_spectrogram(stft(x, 64, 16)),
+    ... )
+    >>> spectrogram(x, 64, 16, chunk_size=7, transform=np.sqrt).shape
+    (2, 66, 33)
     """
-    return stft_to_spectrogram(stft(time_signal, *args, **kwargs))
+    kwargs = dict(
+        axis=axis, window=window, window_length=window_length, fading=fading,
+        pad=pad, symmetric_window=symmetric_window, fft_backend=fft_backend,
+        dtype=dtype,
+    )
+    if chunk_size is None:
+        power = stft_to_spectrogram(stft(time_signal, size, shift, **kwargs))
+        if transform is not None:
+            power = transform(power)
+        return power
+
+    time_signal_seg, window, axis = _stft_segments(
+        time_signal, shift, axis=axis, window=window,
+        window_length=size if window_length is None else window_length,
+        fading=fading, pad=pad, symmetric_window=symmetric_window,
+        dtype=dtype,
+    )
+    if transform is None:
+        chunk_transform = stft_to_spectrogram
+    else:
+        def chunk_transform(stft_signal):
+            return transform(stft_to_spectrogram(stft_signal))
+
+    return _stft_chunked(
+        time_signal_seg, window, size=size, axis=axis,
+        chunk_size=chunk_size, rfft=get_fft_backend(fft_backend).rfft,
+        dtype=np.complex128 if dtype is None else _get_dtypes(dtype)[1],
+        transform=chunk_transform,
+    )
 
 
 def spectrogram_to_energy_per_frame(spectrogram):
@@ -657,7 +1210,9 @@ class STFT:
             window: str = "blackman",
             symmetric_window: bool = False,
             pad: bool = True,
-            fading: typing.Optional[typing.Union[bool, str]] = 'full'
+            fading: typing.Optional[typing.Union[bool, str]] = 'full',
+            fft_backend=None,
+            dtype=None,
     ):
         """
         Transforms audio data to STFT.
@@ -668,10 +1223,15 @@ class STFT:
             shift:
             size:
             window_length:
-            window:
+            window: str, callable or 1D array with length window_length.
+                The windows of an array are not cached.
             symmetric_window:
             fading:
             pad:
+            fft_backend: None, name or object of the FFT backend.
+                See paderbox.transform.module_fft.
+            dtype: None or the floating point precision, e.g. np.float32.
+                See stft.
 
         >>> stft = STFT(160, 512, fading='full')
         >>> audio_data=np.zeros(8000)
@@ -689,6 +1249,57 @@ class STFT:
         self.symmetric_window = symmetric_window
         self.fading = fading
         self.pad = pad
+        self.fft_backend = fft_backend
+        self.dtype = dtype
+        self._windows = {}
+
+    def _get_window(self, synthesis=False, dtype=np.float64):
+        """Returns the analysis or synthesis window.
+
+        The windows are computed once for each dtype and reused in the
+        following calls. An array window is not hashable, hence it is not
+        cached.
+        """
+        dtype = np.dtype(dtype)
+        cache = not isinstance(self.window, np.ndarray)
+        if cache:
+            key = (
+                synthesis, dtype, self.window, self.window_length, self.shift,
+                self.symmetric_window,
+            )
+            try:
+                return self._windows[key]
+            except KeyError:
+                pass
+
+        if synthesis:
+            window = _get_synthesis_window(
+                self.window, self.symmetric_window, self.window_length,
+                self.shift,
+            )
+        else:
+            window = _get_window(
+                self.window, self.symmetric_window, self.window_length,
+            )
+        window = window.astype(dtype)
+        window.setflags(write=False)
+        if cache:
+            self._windows[key] = window
+        return window
+
+    @property
+    def _window_dtype(self):
+        if self.dtype is None:
+            return np.float64
+        return _get_dtypes(self.dtype)[0]
+
+    @property
+    def analysis_window(self):
+        return self._get_window(synthesis=False, dtype=self._window_dtype)
+
+    @property
+    def synthesis_window(self):
+        return self._get_window(synthesis=True, dtype=self._window_dtype)
 
     def __call__(self, x):
         """
@@ -705,11 +1316,13 @@ class STFT:
             size=self.size,
             shift=self.shift,
             window_length=self.window_length,
-            window=self.window,
+            window=self.analysis_window,
             symmetric_window=self.symmetric_window,
             axis=-1,
             fading=self.fading,
-            pad=self.pad
+            pad=self.pad,
+            fft_backend=self.fft_backend,
+            dtype=self.dtype,
         )  # (..., T, F)
 
         return x
@@ -725,14 +1338,16 @@ class STFT:
 
         """
         #  x: (C, T, F)
-        return istft(
+        return _istft(
             x,
+            synthesis_window=self.synthesis_window,
             size=self.size,
             shift=self.shift,
-            window_length=self.window_length,
-            window=self.window,
-            symmetric_window=self.symmetric_window,
-            fading=self.fading
+            fading=self.fading,
+            num_samples=None,
+            pad=self.pad,
+            fft_backend=self.fft_backend,
+            dtype=self.dtype,
         )
 
     def samples_to_frames(self, samples):
@@ -778,3 +1393,376 @@ class STFT:
         return _stft_frames_to_samples(
             frames, self.window_length, self.shift, fading=self.fading
         )
+
+    def sample_intervall_to_frame_intervall(self, intervall):
+        """
+        Converts an ArrayIntervall from sample to frame resolution.
+
+        A frame is active, when it is the best frame (see
+        sample_index_to_frame_index) of an active sample. Samples behind
+        the last frame (e.g. fading=False) belong to the last frame.
+
+        Args:
+            intervall: ArrayIntervall with sample resolution.
+
+        Returns:
+            ArrayIntervall with frame resolution.
+
+        >>> from paderbox.array.intervall import ArrayIntervall
+        >>> stft = STFT(shift=160, size=512, fading=False)
+        >>> ai = ArrayIntervall.from_str('0:1600, 3200:8000', shape=16000)
+        >>> stft.sample_intervall_to_frame_intervall(ai)
+        ArrayIntervall("0:10, 19:50", shape=(98,))
+        """
+        from paderbox.array.intervall import zeros
+
+        if intervall.shape is None:
+            shape = None
+        else:
+            shape = int(self.samples_to_frames(intervall.shape[-1]))
+
+        intervals = intervall.normalized_array
+        start = self.sample_index_to_frame_index(intervals[:, 0])
+        stop = self.sample_index_to_frame_index(intervals[:, 1] - 1) + 1
+        if shape is not None:
+            start = np.minimum(start, max(shape - 1, 0))
+            stop = np.minimum(stop, shape)
+
+        frame_intervall = zeros(shape)
+        frame_intervall.intervals = zip(start.tolist(), stop.tolist())
+        return frame_intervall
+
+    def frame_intervall_to_sample_intervall(self, intervall, num_samples=None):
+        """
+        Converts an ArrayIntervall from frame to sample resolution.
+
+        A sample is active, when its best frame (see
+        sample_index_to_frame_index) is active. Samples behind the last
+        frame belong to the last frame.
+        This is the inverse of sample_intervall_to_frame_intervall for
+        intervals that are aligned to the frames.
+
+        Args:
+            intervall: ArrayIntervall with frame resolution.
+            num_samples: Length of the time signal. Defaults to
+                frames_to_samples of the length of the intervall.
+
+        Returns:
+            ArrayIntervall with sample resolution.
+
+        >>> from paderbox.array.intervall import ArrayIntervall
+        >>> stft = STFT(shift=160, size=512, fading=False)
+        >>> ai = ArrayIntervall.from_str('0:10, 19:50', shape=98)
+        >>> stft.frame_intervall_to_sample_intervall(ai, num_samples=16000)
+        ArrayIntervall("0:1696, 3136:8096", shape=(16000,))
+        """
+        from paderbox.array.intervall import zeros
+
+        if num_samples is None and intervall.shape is not None:
+            num_samples = int(self.frames_to_samples(intervall.shape[-1]))
+
+        intervals = intervall.normalized_array
+        start, stop = _stft_frame_index_to_sample_index(
+            intervals.T, self.window_length, self.shift, fading=self.fading)
+        if intervall.shape is not None and num_samples is not None:
+            stop[intervals[:, 1] >= intervall.shape[-1]] = num_samples
+        if num_samples is not None:
+            start = np.minimum(start, num_samples)
+            stop = np.minimum(stop, num_samples)
+
+        sample_intervall = zeros(num_samples)
+        sample_intervall.intervals = zip(start.tolist(), stop.tolist())
+        return sample_intervall
+
+
+def stft_from_file(path, stft: STFT, frames):
+    """
+    Calculates the STFT frames in the given frame range(s) of an audio file,
+    without reading the whole file.
+
+    Only the samples that are covered by the requested frames (including
+    the window overlap and the zeros of `fading` and `pad`) are read with
+    `load_audio(start=..., stop=...)`. The result is identical to slicing
+    the STFT of the whole file, i.e. `stft(load_audio(path))[..., a:b, :]`.
+
+    Args:
+        path: Path to the audio file.
+        stft: The `STFT` object that defines the parameters.
+        frames: Frame range as tuple `(start, stop)` or slice (without step)
+            or a list of frame ranges. A stop of None means the end of the
+            file.
+
+    Returns:
+        The STFT frames with shape (..., stop - start, size // 2 + 1) or a
+        list of them, when frames is a list.
+
+    >>> from paderbox.io import dump_audio
+    >>> from paderbox.io.cache_dir import get_cache_dir
+    >>> from paderbox.io import load_audio
+    >>> path = get_cache_dir() / 'stft_from_file_doctest.wav'
+    >>> dump_audio(np.random.uniform(-0.5, 0.5, size=8000), path)
+    >>> stft = STFT(shift=160, size=512, window_length=400)
+    >>> X = stft(load_audio(path))
+    >>> X.shape
+    (52, 257)
+    >>> np.testing.assert_equal(stft_from_file(path, stft, (10, 20)), X[10:20])
+    >>> [x.shape for x in stft_from_file(path, stft, [(0, 3), slice(50, None)])]
+    [(3, 257), (2, 257)]
+    """
+    import soundfile
+    from paderbox.io.audioread import load_audio
+    from paderbox.io.path_utils import normalize_path
+
+    if isinstance(frames, list):
+        return [stft_from_file(path, stft, f) for f in frames]
+
+    if isinstance(frames, slice):
+        assert frames.step in [None, 1], frames
+        start, stop = frames.start, frames.stop
+    else:
+        start, stop = frames
+    if start is None:
+        start = 0
+
+    num_samples = soundfile.info(normalize_path(path, as_str=True)).frames
+    # For signals shorter than the window, stft still yields one frame.
+    num_frames = max(
+        stft.samples_to_frames(num_samples), 1 if stft.pad else 0)
+    if stop is None:
+        stop = num_frames
+    assert 0 <= start <= stop <= num_frames, (start, stop, num_frames)
+
+    pad_width, _ = _fading_pad_width(
+        stft.window_length, stft.shift, stft.fading)
+
+    # Sample span of the frames, relative to the begin of the file. It may
+    # exceed the file at the begin (fading) and at the end (fading and pad),
+    # where the offline stft uses zeros.
+    begin = start * stft.shift - pad_width
+    end = begin + _stft_frames_to_samples(
+        stop - start, stft.window_length, stft.shift)
+
+    time_signal = load_audio(
+        path,
+        start=max(begin, 0),
+        stop=max(min(end, num_samples), 0),
+        # stft.dtype may be complex (e.g. np.complex64), load_audio needs
+        # the real dtype.
+        dtype=stft._window_dtype,
+    )
+    pad_begin = max(-begin, 0)
+    pad_end = end - begin - time_signal.shape[-1] - pad_begin
+    time_signal = np.pad(
+        time_signal,
+        [(0, 0)] * (time_signal.ndim - 1) + [(pad_begin, pad_end)],
+        mode='constant',
+    )
+
+    if stop == start:
+        return np.zeros(
+            (*time_signal.shape[:-1], 0, stft.size // 2 + 1),
+            dtype=_get_dtypes(stft._window_dtype)[1],
+        )
+
+    # The argument stft shadows the function stft of this module.
+    from paderbox.transform.module_stft import stft as stft_function
+    return stft_function(
+        time_signal,
+        size=stft.size,
+        shift=stft.shift,
+        window_length=stft.window_length,
+        window=stft.analysis_window,
+        symmetric_window=stft.symmetric_window,
+        fading=False,
+        pad=False,
+        fft_backend=stft.fft_backend,
+        dtype=stft.dtype,
+    )
+
+
+class MultiResolutionSTFT:
+    def __init__(self, stfts):
+        """
+        Calculates several STFTs with different resolutions (e.g. for multi
+        resolution spectral losses) of the same signal in one pass.
+
+        Resolutions with the same window_length are framed together: The
+        signal is padded once for them and they share the segment_axis view,
+        when the shift (and the start offset) of one is an integer multiple
+        of the shift of the other, e.g. shift 128 and 256 with
+        fading='full'. Resolutions with a unique window_length are
+        calculated with their `STFT`, because the shared padded buffer would
+        be an additional copy of the signal. The windowing and the FFT are
+        calculated for each resolution, hence there is no gain compared to
+        independent `STFT` calls, when the window lengths differ. The result
+        of each resolution is identical to the corresponding `STFT`.
+
+        Args:
+            stfts: List of `STFT` objects or dict from name to `STFT` object.
+                For a list, the keys of the output are (size, shift).
+
+        >>> mr_stft = MultiResolutionSTFT([
+        ...     STFT(shift=120, size=1024, window_length=600),
+        ...     STFT(shift=240, size=2048, window_length=1200),
+        ...     STFT(shift=50, size=512, window_length=240),
+        ... ])
+        >>> x = np.random.normal(size=(2, 16000))
+        >>> {k: v.shape for k, v in mr_stft(x).items()}
+        {(1024, 120): (2, 138, 513), (2048, 240): (2, 71, 1025), (512, 50): (2, 324, 257)}
+        >>> np.testing.assert_equal(
+        ...     mr_stft(x)[(512, 50)],
+        ...     stft(x, 512, 50, window_length=240),
+        ... )
+        """
+        if isinstance(stfts, dict):
+            self.stfts = dict(stfts)
+        else:
+            self.stfts = {(s.size, s.shift): s for s in stfts}
+            assert len(self.stfts) == len(stfts), (
+                'The keys (size, shift) are not unique, use a dict.',
+                [(s.size, s.shift) for s in stfts],
+            )
+
+    def _shared_keys(self):
+        """
+        The keys of the resolutions, that share the window_length with
+        another resolution. Only these can share frames, the others are
+        calculated with their `STFT`, because the shared buffer would be an
+        additional copy of the signal.
+        """
+        window_lengths = [stft_.window_length for stft_ in self.stfts.values()]
+        return [
+            key for key, stft_ in self.stfts.items()
+            if window_lengths.count(stft_.window_length) > 1
+        ]
+
+    def _segments(self, time_signal, keys):
+        """
+        Frames the signal for the resolutions `keys`.
+
+        The signal is padded once. A resolution reuses the frames of another
+        resolution with the same window_length as a strided view, when its
+        frames are a subset of the frames of the other resolution, i.e. its
+        shift and its start are integer multiples of the shift of the other.
+
+        Args:
+            time_signal: Time signal with shape (..., samples).
+            keys: Keys of the resolutions.
+
+        Returns:
+            Dict from key to the segment_axis view with shape
+            (..., frames, window_length) or None, when there is no frame.
+        """
+        num_samples = time_signal.shape[-1]
+
+        layout = {}
+        for key in keys:
+            stft_ = self.stfts[key]
+            offset, _ = _fading_pad_width(
+                stft_.window_length, stft_.shift, stft_.fading)
+            # segment_axis pads signals, that are shorter than one frame, to
+            # one frame
+            frames = max(
+                stft_.samples_to_frames(num_samples), 1 if stft_.pad else 0)
+            if frames > 0:
+                length = _stft_frames_to_samples(
+                    frames, stft_.window_length, stft_.shift)
+            else:
+                length = 0
+            layout[key] = offset, frames, length
+
+        # Shared buffer, that contains the padding of all resolutions
+        max_offset = max([offset for offset, _, _ in layout.values()])
+        buffer_length = max([num_samples + max_offset] + [
+            max_offset - offset + length
+            for offset, _, length in layout.values()
+        ])
+        buffer = np.zeros(
+            (*time_signal.shape[:-1], buffer_length),
+            dtype=np.result_type(time_signal, np.float64),
+        )
+        buffer[..., max_offset:max_offset + num_samples] = time_signal
+
+        segments = {}
+        # (start, window_length, shift, frames, view) of the framed signals.
+        # Small shifts first, because they can be reused by larger shifts.
+        bases = []
+        for key in sorted(layout, key=lambda k: (
+                self.stfts[k].shift, -layout[k][1])):
+            stft_ = self.stfts[key]
+            offset, frames, length = layout[key]
+            start = max_offset - offset
+
+            if frames == 0:
+                segments[key] = None
+                continue
+
+            for b_start, b_window_length, b_shift, b_frames, b_view in bases:
+                if (
+                        b_window_length == stft_.window_length
+                        and stft_.shift % b_shift == 0
+                        and start >= b_start
+                        and (start - b_start) % b_shift == 0
+                ):
+                    first = (start - b_start) // b_shift
+                    step = stft_.shift // b_shift
+                    last = first + (frames - 1) * step
+                    if last < b_frames:
+                        segments[key] = b_view[..., first:last + 1:step, :]
+                        break
+            else:
+                segments[key] = segment_axis(
+                    buffer[..., start:start + length],
+                    stft_.window_length,
+                    shift=stft_.shift,
+                    axis=-1,
+                    end=None,
+                )
+                bases.append((
+                    start, stft_.window_length, stft_.shift, frames,
+                    segments[key],
+                ))
+        return segments
+
+    def __call__(self, time_signal):
+        """
+        Args:
+            time_signal: Time signal with shape (..., samples).
+
+        Returns:
+            Dict from key to the STFT with shape (..., frames, size // 2 + 1).
+        """
+        time_signal = np.asarray(time_signal)
+        shared_keys = self._shared_keys()
+        if shared_keys:
+            segments = self._segments(time_signal, shared_keys)
+        else:
+            segments = {}
+
+        stft_signals = {}
+        for key, stft_ in self.stfts.items():
+            if key not in segments:
+                stft_signals[key] = stft_(time_signal)
+                continue
+            time_signal_seg = segments[key]
+
+            if time_signal_seg is None:
+                _, complex_dtype = _get_dtypes(stft_._window_dtype)
+                stft_signals[key] = np.zeros(
+                    (*time_signal.shape[:-1], 0, stft_.size // 2 + 1),
+                    dtype=complex_dtype,
+                )
+                continue
+
+            if stft_.dtype is not None:
+                dtype, complex_dtype = _get_dtypes(stft_.dtype)
+                time_signal_seg = time_signal_seg.astype(dtype, copy=False)
+
+            stft_signal = get_fft_backend(stft_.fft_backend).rfft(
+                time_signal_seg * stft_.analysis_window, n=stft_.size, axis=-1,
+            )
+            if stft_.dtype is not None:
+                stft_signal = stft_signal.astype(complex_dtype, copy=False)
+            stft_signals[key] = stft_signal
+
+        return stft_signals
@@ -0,0 +1,261 @@
+"""
+Block-wise (online) variants of the STFT and the inverse STFT.
+
+The objects in this file keep the overlap between successive blocks
+internally, such that a signal can be processed in arbitrarily sized blocks
+while yielding the same result as the offline transform on the concatenated
+signal.
+"""
+import numpy as np
+
+from paderbox.transform.module_stft import STFT
+from paderbox.transform.module_stft import stft
+from paderbox.transform.module_stft import _overlap_add
+from paderbox.transform.module_stft import _get_dtypes
+from paderbox.transform.module_stft import _fading_pad_width
+from paderbox.transform.module_fft import get_fft_backend
+
+
+class StreamingSTFT:
+    def __init__(self, stft: STFT):
+        """
+        Calculates the STFT of a signal that arrives block by block.
+
+        Each call consumes a block of samples and returns only the frames
+        that are completed by this block. The samples that belong to frames
+        that are not yet complete are kept internally. Call `flush` after the
+        last block to obtain the frames that depend on the end of the signal
+        (i.e. `fading` and `pad` of the given `STFT`).
+
+        The concatenation of all returned frames is identical to the offline
+        STFT of the concatenated blocks.
+
+        Args:
+            stft: The `STFT` object that defines the parameters.
+
+        >>> stft = STFT(shift=4, size=16, fading=False)
+        >>> streaming_stft = StreamingSTFT(stft)
+        >>> x = np.random.normal(size=(2, 50))
+        >>> streaming_stft(x[..., :3]).shape
+        (2, 0, 9)
+        >>> streaming_stft(x[..., 3:20]).shape
+        (2, 2, 9)
+        >>> streaming_stft(x[..., 20:]).shape
+        (2, 7, 9)
+        >>> streaming_stft.flush().shape
+        (2, 1, 9)
+        >>> stft(x).shape
+        (2, 10, 9)
+        """
+        self.stft = stft
+        # Leading (batch) shape of the last block. It is kept by reset, such
+        # that flush returns an empty result with the batch shape, when
+        # nothing was fed since the last flush.
+        self._independent = ()
+        self.reset()
+
+    def reset(self):
+        """Forget the internal state to start with a new signal."""
+        self._buffer = None
+        self._frames = 0
+
+    def _transform(self, time_signal, pad):
+        return stft(
+            time_signal,
+            size=self.stft.size,
+            shift=self.stft.shift,
+            window_length=self.stft.window_length,
+            window=self.stft.analysis_window,
+            symmetric_window=self.stft.symmetric_window,
+            axis=-1,
+            fading=False,
+            pad=pad,
+            fft_backend=self.stft.fft_backend,
+            dtype=self.stft.dtype,
+        )
+
+    def _empty(self, independent):
+        _, complex_dtype = _get_dtypes(self.stft._window_dtype)
+        return np.zeros(
+            (*independent, 0, self.stft.size // 2 + 1), dtype=complex_dtype)
+
+    def __call__(self, block):
+        """
+        Args:
+            block: Time signal block with shape (..., samples).
+
+        Returns:
+            The newly completed frames with shape (..., frames, size // 2 + 1).
+        """
+        block = np.asarray(block)
+        self._independent = block.shape[:-1]
+        window_length = self.stft.window_length
+        shift = self.stft.shift
+
+        if self._buffer is None:
+            pad_width, _ = _fading_pad_width(
+                window_length, shift, self.stft.fading)
+            self._buffer = np.zeros(
+                (*block.shape[:-1], pad_width), dtype=block.dtype)
+
+        buffer = np.concatenate([self._buffer, block], axis=-1)
+
+        samples = buffer.shape[-1]
+        if samples < window_length:
+            self._buffer = buffer
+            return self._empty(buffer.shape[:-1])
+
+        frames = (samples - window_length) // shift + 1
+        consumed = (frames - 1) * shift + window_length
+
+        stft_signal = self._transform(buffer[..., :consumed], pad=False)
+
+        self._buffer = buffer[..., frames * shift:]
+        self._frames += frames
+        return stft_signal
+
+    def flush(self):
+        """
+        Appends the fade out and the padding of the offline STFT and returns
+        the remaining frames. Afterwards the object is reset.
+
+        Returns:
+            The remaining frames with shape (..., frames, size // 2 + 1).
+            When nothing was fed, the batch shape is that of the last
+            block before the last reset (or () for a new object).
+        """
+        if self._buffer is None:
+            return self._empty(self._independent)
+
+        window_length = self.stft.window_length
+        shift = self.stft.shift
+
+        _, pad_width = _fading_pad_width(
+            window_length, shift, self.stft.fading)
+        buffer = np.pad(
+            self._buffer,
+            [(0, 0)] * (self._buffer.ndim - 1) + [(0, pad_width)],
+            mode='constant',
+        )
+
+        # Equal to __call__, only the last frame may be incomplete.
+        stft_signal = self(buffer[..., self._buffer.shape[-1]:])
+        buffer = self._buffer
+
+        # With pad=True, segment_axis pads the last incomplete frame, when it
+        # contains samples that are not covered by a previous frame.
+        if self.stft.pad and (
+                self._frames == 0 or buffer.shape[-1] > window_length - shift
+        ):
+            stft_signal = np.concatenate(
+                [stft_signal, self._transform(buffer, pad=True)], axis=-2)
+
+        self.reset()
+        return stft_signal
+
+
+class StreamingISTFT:
+    def __init__(self, stft: STFT):
+        """
+        Calculates the inverse STFT of frames that arrive block by block.
+
+        Each call consumes some STFT frames and returns the time samples that
+        are finished, i.e. no later frame overlaps with them. The overlap
+        is kept internally. Call `flush` after the last frames to obtain the
+        remaining samples.
+
+        The concatenation of all returned samples is identical to the offline
+        inverse STFT of the concatenated frames.
+
+        Args:
+            stft: The `STFT` object that defines the parameters.
+
+        >>> stft = STFT(shift=4, size=16, fading='full')
+        >>> streaming_istft = StreamingISTFT(stft)
+        >>> x = np.random.normal(size=(2, 50))
+        >>> X = stft(x)
+        >>> X.shape
+        (2, 16, 9)
+        >>> streaming_istft(X[..., :3, :]).shape
+        (2, 0)
+        >>> streaming_istft(X[..., 3:, :]).shape
+        (2, 52)
+        >>> streaming_istft.flush().shape
+        (2, 0)
+        >>> np.testing.assert_allclose(stft.inverse(X)[..., :50], x)
+        """
+        self.stft = stft
+        # Leading (batch) shape of the last frames, see StreamingSTFT.
+        self._independent = ()
+        self.reset()
+
+    def reset(self):
+        """Forget the internal state to start with a new signal."""
+        self._tail = None
+        self._skip, self._trim = _fading_pad_width(
+            self.stft.window_length, self.stft.shift, self.stft.fading
+        )
+
+    def _discard_fade_in(self, time_signal):
+        skip = min(self._skip, time_signal.shape[-1])
+        self._skip -= skip
+        return time_signal[..., skip:]
+
+    def __call__(self, stft_signal):
+        """
+        Args:
+            stft_signal: STFT frames with shape (..., frames, size // 2 + 1).
+
+        Returns:
+            The finished time samples with shape (..., samples).
+        """
+        dtype, complex_dtype = _get_dtypes(self.stft._window_dtype)
+        stft_signal = np.asarray(stft_signal)
+        if self.stft.dtype is not None:
+            stft_signal = stft_signal.astype(complex_dtype, copy=False)
+        assert stft_signal.shape[-1] == self.stft.size // 2 + 1, \
+            stft_signal.shape
+        self._independent = stft_signal.shape[:-2]
+
+        window_length = self.stft.window_length
+        shift = self.stft.shift
+        frames = stft_signal.shape[-2]
+
+        time_signal = np.zeros(
+            (*stft_signal.shape[:-2], frames * shift + window_length - shift),
+            dtype=dtype,
+        )
+        if self._tail is not None:
+            time_signal[..., :window_length - shift] = self._tail
+
+        irfft = get_fft_backend(self.stft.fft_backend).irfft
+        _overlap_add(
+            self.stft.synthesis_window * np.real(
+                irfft(stft_signal)
+            )[..., :window_length].astype(dtype, copy=False),
+            shift,
+            out=time_signal,
+        )
+
+        self._tail = time_signal[..., frames * shift:]
+        return self._discard_fade_in(time_signal[..., :frames * shift])
+
+    def flush(self):
+        """
+        Returns the remaining samples without the fade out of the offline STFT.
+        Afterwards the object is reset.
+
+        Returns:
+            The remaining time samples with shape (..., samples).
+            When nothing was fed, the batch shape is that of the last
+            frames before the last reset (or () for a new object).
+        """
+        if self._tail is None:
+            dtype, _ = _get_dtypes(self.stft._window_dtype)
+            time_signal = np.zeros((*self._independent, 0), dtype=dtype)
+        else:
+            time_signal = self._discard_fade_in(self._tail)
+            time_signal = time_signal[
+                ..., :max(time_signal.shape[-1] - self._trim, 0)]
+        self.reset()
+        return time_signal
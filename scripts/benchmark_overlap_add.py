@@ -0,0 +1,91 @@
+"""
+Compares the overlap-add in istft (np.add.at on a segment_axis view) with
+the vectorized _overlap_add kernel.
+
+vm
+OMP_NUM_THREADS None
+MKL_NUM_THREADS None
+
+window_length=512 shift=128 batch_shape=(): add_at 0.3504s overlap_add 0.0039s speedup 89.2x
+window_length=512 shift=128 batch_shape=(8,): add_at 2.3368s overlap_add 0.0496s speedup 47.1x
+window_length=512 shift=128 batch_shape=(4, 6): add_at 6.4813s overlap_add 0.1734s speedup 37.4x
+window_length=1024 shift=256 batch_shape=(): add_at 0.2271s overlap_add 0.0035s speedup 64.3x
+window_length=1024 shift=256 batch_shape=(8,): add_at 2.0317s overlap_add 0.0462s speedup 44.0x
+window_length=1024 shift=256 batch_shape=(4, 6): add_at 5.4225s overlap_add 0.1620s speedup 33.5x
+window_length=400 shift=160 batch_shape=(): add_at 0.1612s overlap_add 0.0074s speedup 21.7x
+window_length=400 shift=160 batch_shape=(8,): add_at 1.1471s overlap_add 0.0758s speedup 15.1x
+window_length=400 shift=160 batch_shape=(4, 6): add_at 4.6629s overlap_add 0.3501s speedup 13.3x
+"""
+import timeit
+import socket
+import os
+
+import numpy as np
+from paderbox.array import segment_axis
+from paderbox.transform.module_stft import _overlap_add
+
+
+CONFIGURATIONS = [
+    # (window_length, shift)
+    (512, 128),
+    (1024, 256),
+    (400, 160),  # window_length % shift != 0 -> fallback
+]
+BATCH_SHAPES = [(), (8,), (4, 6)]
+T = 16000 * 5
+
+
+def setup_add_at(window_length, shift, batch_shape):
+    frames = (T - window_length) // shift + 1
+    x = np.random.normal(size=(*batch_shape, frames, window_length))
+
+    def fn(x_):
+        time_signal = np.zeros(
+            (*batch_shape, frames * shift + window_length - shift))
+        np.add.at(
+            segment_axis(time_signal, window_length, shift, end=None),
+            ...,
+            x_,
+        )
+        return time_signal
+
+    return x, fn
+
+
+def setup_overlap_add(window_length, shift, batch_shape):
+    frames = (T - window_length) // shift + 1
+    x = np.random.normal(size=(*batch_shape, frames, window_length))
+
+    def fn(x_):
+        return _overlap_add(x_, shift)
+
+    return x, fn
+
+
+if __name__ == '__main__':
+    print(socket.gethostname())
+    print('OMP_NUM_THREADS', os.environ.get('OMP_NUM_THREADS'))
+    print('MKL_NUM_THREADS', os.environ.get('MKL_NUM_THREADS'))
+    print()
+    repeats = 10
+
+    for window_length, shift in CONFIGURATIONS:
+        for batch_shape in BATCH_SHAPES:
+            times = {}
+            for kernel in ['add_at', 'overlap_add']:
+                t = timeit.Timer(
+                    'fn(x)',
+                    setup=(
+                        f'from __main__ import setup_{kernel}; '
+                        f'x, fn = setup_{kernel}'
+                        f'({window_length}, {shift}, {batch_shape})'
+                    )
+                )
+                times[kernel] = min(t.repeat(number=repeats, repeat=3))
+            print(
+                f'window_length={window_length} shift={shift} '
+                f'batch_shape={batch_shape}: '
+                f'add_at {times["add_at"]:.4f}s '
+                f'overlap_add {times["overlap_add"]:.4f}s '
+                f'speedup {times["add_at"] / times["overlap_add"]:.1f}x'
+            )
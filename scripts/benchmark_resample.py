@@ -0,0 +1,79 @@
+"""
+Throughput of resample_polyphase (in process) and resample_sox (one sox
+subprocess per call) in input samples per second.
+
+vm
+OMP_NUM_THREADS None
+MKL_NUM_THREADS None
+
+sox is not installed, skip resample_sox
+16000 -> 8000 shape=(16000,): polyphase 3.4M/s
+16000 -> 8000 shape=(960000,): polyphase 3.7M/s
+16000 -> 8000 shape=(8, 160000): polyphase 3.7M/s
+8000 -> 16000 shape=(16000,): polyphase 1.7M/s
+8000 -> 16000 shape=(960000,): polyphase 1.8M/s
+8000 -> 16000 shape=(8, 160000): polyphase 1.8M/s
+48000 -> 16000 shape=(16000,): polyphase 2.7M/s
+48000 -> 16000 shape=(960000,): polyphase 3.1M/s
+48000 -> 16000 shape=(8, 160000): polyphase 3.0M/s
+44100 -> 16000 shape=(16000,): polyphase 2.1M/s
+44100 -> 16000 shape=(960000,): polyphase 2.9M/s
+44100 -> 16000 shape=(8, 160000): polyphase 3.0M/s
+"""
+import timeit
+import socket
+import os
+import shutil
+
+import numpy as np
+from paderbox.transform.module_resample import resample_polyphase
+from paderbox.transform.module_resample import resample_sox
+
+
+CONFIGURATIONS = [
+    # (in_rate, out_rate)
+    (16000, 8000),
+    (8000, 16000),
+    (48000, 16000),
+    (44100, 16000),
+]
+SHAPES = [
+    (16000,),  # 1 s, typical per utterance call
+    (16000 * 60,),  # 1 min
+    (8, 16000 * 10),  # 8 channels
+]
+
+
+def benchmark(fn, x, in_rate, out_rate, number=3):
+    fn(x, in_rate=in_rate, out_rate=out_rate)  # warm up (filter design)
+    t = min(timeit.repeat(
+        lambda: fn(x, in_rate=in_rate, out_rate=out_rate),
+        number=number, repeat=3,
+    )) / number
+    return x.size / t
+
+
+def main():
+    print(socket.gethostname())
+    print('OMP_NUM_THREADS', os.environ.get('OMP_NUM_THREADS'))
+    print('MKL_NUM_THREADS', os.environ.get('MKL_NUM_THREADS'))
+    print()
+
+    functions = {'polyphase': resample_polyphase}
+    if shutil.which('sox') is not None:
+        functions['sox'] = resample_sox
+    else:
+        print('sox is not installed, skip resample_sox')
+
+    for in_rate, out_rate in CONFIGURATIONS:
+        for shape in SHAPES:
+            x = np.random.normal(size=shape).astype(np.float32)
+            results = ' '.join([
+                f'{name} {benchmark(fn, x, in_rate, out_rate) / 1e6:.1f}M/s'
+                for name, fn in functions.items()
+            ])
+            print(f'{in_rate} -> {out_rate} shape={shape}: {results}')
+
+
+if __name__ == '__main__':
+    main()
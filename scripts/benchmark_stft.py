@@ -44,6 +44,26 @@ def setup_nt():
     return X, fn
 
 
+def setup_nt_scipy():
+    # Uses all cores
+    fn = partial(
+        pb.transform.stft, size=SIZE, shift=SHIFT, fading=False, pad=False,
+        fft_backend=pb.transform.get_fft_backend('scipy', workers=-1),
+    )
+
+    return X, fn
+
+
+def setup_nt_pyfftw():
+    # Uses all cores, requires pyFFTW
+    fn = partial(
+        pb.transform.stft, size=SIZE, shift=SHIFT, fading=False, pad=False,
+        fft_backend=pb.transform.get_fft_backend('pyfftw', workers=-1),
+    )
+
+    return X, fn
+
+
 def setup_librosa():
     # Librosa cache is off by default
     # https://librosa.github.io/librosa/cache.html#enabling-the-cache
@@ -81,7 +101,16 @@ if __name__ == '__main__':
     print()
     repeats = 100
 
-    for library in 'nt librosa scipy python_speech_features'.split():
+    libraries = (
+        'nt nt_scipy nt_pyfftw librosa scipy python_speech_features'.split()
+    )
+    try:
+        pb.transform.get_fft_backend('pyfftw')
+    except ImportError:
+        print('pyFFTW is not installed, skip nt_pyfftw')
+        print()
+        libraries.remove('nt_pyfftw')
+    for library in libraries:
         print(library)
         t = timeit.Timer(
             'fn(x)',
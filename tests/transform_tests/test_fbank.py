@@ -40,4 +40,49 @@ class TestSTFTMethods(unittest.TestCase):
                 transform.module_fbank.hz2mel(rand)))
         tc.assert_almost_equal(rand, transform.module_fbank.hz2mel(transform.module_fbank.mel2hz(rand)))
 
+    def test_fbank_single_precision(self):
+        y = np.random.RandomState(0).normal(size=16000)
+        feature = transform.fbank(y)
+        feature32 = transform.fbank(y, dtype=np.float32)
+        tc.assert_equal(feature32.dtype, np.float32)
+        tc.assert_allclose(feature32, feature, rtol=1e-4)
+
+        feature32 = transform.logfbank(y, dtype=np.float32)
+        tc.assert_equal(feature32.dtype, np.float32)
+        feature32 = transform.mfcc(y, dtype=np.float32)
+        tc.assert_equal(feature32.dtype, np.float32)
+
+    def test_fbank_chunk_size(self):
+        y = np.random.RandomState(0).normal(size=(2, 16000))
+        tc.assert_equal(
+            transform.fbank(y, chunk_size=7),
+            transform.fbank(y, chunk_size=None),
+        )
+
+    def test_mel_transform_bands(self):
+        for args in [
+            (16000, 512, 40, 50, None),
+            (16000, 512, 23, 0, 8000),
+            (8000, 1024, 128, 20, None),
+        ]:
+            mel_transform = transform.module_fbank.MelTransform(
+                *args, log=False)
+            x = np.random.rand(2, 10, args[1] // 2 + 1)
+            tc.assert_allclose(
+                mel_transform(x), np.dot(x, mel_transform.fbanks),
+                rtol=1e-12,
+            )
+
+    def test_mel_transform_shape_mismatch(self):
+        mel_transform = transform.module_fbank.MelTransform(16000, 512, 40)
+        for frequencies in [256, 258, 513]:
+            with self.assertRaises(AssertionError):
+                mel_transform(np.random.rand(10, frequencies))
 
+    def test_mel_filterbank_cache(self):
+        MelTransform = transform.module_fbank.MelTransform
+        fbanks = MelTransform(16000, 512, 40).fbanks
+        assert MelTransform(16000, 512, 40).fbanks is fbanks
+        assert not fbanks.flags.writeable
+        assert MelTransform(16000, 512, 40, dtype=np.float64).fbanks \
+            is not fbanks
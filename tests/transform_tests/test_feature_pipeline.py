@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+import paderbox.testing as tc
+import paderbox.transform as transform
+from paderbox.transform.module_mfcc import delta
+
+
+class TestFeaturePipeline(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(size=(2, 16000))
+
+    def test_equals_functions(self):
+        pipeline = transform.FeaturePipeline(
+            ['fbank', 'logfbank', 'mfcc', 'delta', 'delta_delta'],
+            chunk_size=7,
+        )
+        features = pipeline(self.x)
+        mfcc = transform.mfcc(self.x)
+        tc.assert_equal(
+            features['fbank'],
+            transform.fbank(self.x, number_of_filters=26),
+        )
+        tc.assert_equal(
+            features['logfbank'],
+            transform.logfbank(self.x, number_of_filters=26),
+        )
+        tc.assert_equal(features['mfcc'], mfcc)
+        tc.assert_equal(features['delta'], delta(mfcc, order=1, axis=-2))
+        tc.assert_equal(
+            features['delta_delta'], delta(mfcc, order=2, axis=-2))
+
+    def test_spectrogram_and_energy(self):
+        features = transform.FeaturePipeline(
+            ['spectrogram', 'energy', 'logfbank'])(self.x)
+        tc.assert_equal(
+            features['energy'], np.sum(features['spectrogram'], axis=-1))
+        tc.assert_equal(
+            features['logfbank'],
+            transform.FeaturePipeline(['logfbank', 'energy'])(
+                self.x)['logfbank'],
+        )
+
+    def test_reuse_out(self):
+        pipeline = transform.FeaturePipeline(
+            ['spectrogram', 'energy', 'fbank', 'logfbank', 'mfcc'])
+        features = pipeline(self.x)
+        expected = pipeline(self.x[..., ::-1])
+        reused = pipeline(self.x[..., ::-1], out=features)
+        for key, value in reused.items():
+            assert value is features[key], key
+            tc.assert_equal(value, expected[key])
+
+    def test_unknown_output(self):
+        with self.assertRaises(ValueError):
+            transform.FeaturePipeline(['mfc'])
@@ -0,0 +1,67 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import paderbox.testing as tc
+from paderbox.transform.module_fft import fft_backend
+from paderbox.transform.module_fft import get_fft_backend
+from paderbox.transform.module_stft import STFT
+from paderbox.transform.module_stft import istft
+from paderbox.transform.module_stft import stft
+
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+
+class TestFFTBackend(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(size=(2, 5000))
+
+    def check_backend(self, backend):
+        X_ref = stft(self.x, 512, 128, fft_backend='numpy')
+        X = stft(self.x, 512, 128, fft_backend=backend)
+        tc.assert_allclose(X, X_ref, atol=1e-10)
+        tc.assert_allclose(
+            istft(X, 512, 128, fft_backend=backend),
+            istft(X_ref, 512, 128, fft_backend='numpy'),
+            atol=1e-10,
+        )
+
+    def test_scipy(self):
+        self.check_backend('scipy')
+        self.check_backend(get_fft_backend('scipy', workers=-1))
+
+    @unittest.skipIf(pyfftw is None, 'pyfftw is not installed')
+    def test_pyfftw(self):
+        self.check_backend('pyfftw')
+        self.check_backend(get_fft_backend('pyfftw', workers=2))
+
+    def test_context_manager(self):
+        with fft_backend('scipy', workers=2):
+            tc.assert_equal(get_fft_backend().name, 'scipy')
+            with fft_backend('numpy'):
+                tc.assert_equal(get_fft_backend().name, 'numpy')
+            tc.assert_equal(get_fft_backend().name, 'scipy')
+            # The argument has a higher priority than the context manager
+            tc.assert_equal(get_fft_backend('numpy').name, 'numpy')
+        tc.assert_equal(get_fft_backend().name, 'numpy')
+
+    def test_environment_variable(self):
+        with mock.patch.dict(os.environ, {
+            'PADERBOX_FFT_BACKEND': 'scipy',
+            'PADERBOX_FFT_WORKERS': '2',
+        }):
+            backend = get_fft_backend()
+            tc.assert_equal(backend.name, 'scipy')
+            tc.assert_equal(backend.workers, 2)
+
+    def test_stft_object(self):
+        stft_ = STFT(128, 512, fft_backend='scipy')
+        X = stft_(self.x)
+        tc.assert_allclose(X, stft(self.x, 512, 128), atol=1e-10)
+        tc.assert_allclose(
+            stft_.inverse(X)[..., :self.x.shape[-1]], self.x, atol=1e-10)
@@ -1,11 +1,15 @@
 import unittest
 
+import numpy as np
+from scipy.signal import medfilt
+
 from paderbox.io.audioread import audioread
 # from scipy import signal
 
 import paderbox.testing as tc
 from paderbox.testing.testfile_fetcher import get_file_path
 import paderbox.transform as transform
+from paderbox.transform import module_filter
 # from pymatbridge import Matlab
 
 
@@ -43,3 +47,97 @@ class TestSTFTMethods(unittest.TestCase):
         y_both = transform.preemphasis_with_offset_compensation(y)
 
         tc.assert_almost_equal(y_ref, y_both)
+
+
+class TestStatefulFilter(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(size=(2, 3, 1000))
+
+    def check_blocks(self, stateful_filter, reference, boundaries):
+        blocks = [
+            stateful_filter(self.x[..., start:stop])
+            for start, stop in zip(boundaries[:-1], boundaries[1:])
+        ]
+        np.testing.assert_equal(
+            np.concatenate(blocks, axis=-1), reference(self.x))
+
+    def test_blocks(self):
+        for stateful_filter, reference in [
+            (transform.Preemphasis(0.97),
+             lambda x: transform.preemphasis(x, 0.97)),
+            (transform.InversePreemphasis(0.97),
+             lambda x: transform.inverse_preemphasis(x, 0.97)),
+            (transform.OffsetCompensation(),
+             transform.offset_compensation),
+            (transform.PreemphasisWithOffsetCompensation(0.97),
+             lambda x: transform.preemphasis_with_offset_compensation(
+                 x, 0.97)),
+        ]:
+            for boundaries in [
+                [0, 1000],
+                [0, 500, 1000],
+                [0, 1, 2, 3, 3, 100, 1000],
+            ]:
+                with self.subTest(
+                        stateful_filter=stateful_filter,
+                        boundaries=boundaries,
+                ):
+                    stateful_filter.reset()
+                    self.check_blocks(stateful_filter, reference, boundaries)
+
+    def test_reset(self):
+        f = transform.Preemphasis()
+        a = f(self.x)
+        f(self.x)
+        f.reset()
+        np.testing.assert_equal(f(self.x), a)
+
+
+class TestMedian(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(size=(3, 500))
+
+    def test_medfilt(self):
+        for window_size in [1, 3, 31, 33, 101, 499, 501, 1001]:
+            with self.subTest(window_size=window_size):
+                np.testing.assert_equal(
+                    module_filter.median(self.x[0], window_size),
+                    medfilt(self.x[0], window_size),
+                )
+                np.testing.assert_equal(
+                    module_filter.median(self.x.T, window_size, axis=0),
+                    np.array([
+                        medfilt(signal, window_size) for signal in self.x
+                    ]).T,
+                )
+
+    def test_integer(self):
+        x = np.random.RandomState(1).randint(0, 10, size=1000)
+        y = module_filter.median(x, 51)
+        self.assertEqual(y.dtype, x.dtype)
+        np.testing.assert_equal(y, medfilt(x, 51))
+
+    def test_nd_kernel(self):
+        np.testing.assert_equal(
+            module_filter.median(self.x, 3), medfilt(self.x, 3))
+
+    def test_even_window_size(self):
+        with self.assertRaises(ValueError):
+            module_filter.median(self.x[0], 4)
+
+    def test_running_median_blocks(self):
+        for window_size in [1, 5, 101]:
+            reference = module_filter.median(self.x, window_size, axis=-1)
+            for boundaries in [
+                [0, 500],
+                [0, 1, 1, 2, 30, 499, 500],
+            ]:
+                with self.subTest(
+                        window_size=window_size, boundaries=boundaries):
+                    running_median = module_filter.RunningMedian(window_size)
+                    blocks = [
+                        running_median(self.x[..., start:stop])
+                        for start, stop in zip(boundaries[:-1], boundaries[1:])
+                    ] + [running_median.flush()]
+                    np.testing.assert_equal(
+                        np.concatenate(blocks, axis=-1), reference)
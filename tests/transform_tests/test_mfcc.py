@@ -1,5 +1,8 @@
 import unittest
 
+import numpy as np
+import scipy.signal
+
 from paderbox.io.audioread import audioread
 # from scipy import signal
 
@@ -19,3 +22,44 @@ class TestSTFTMethods(unittest.TestCase):
 
         tc.assert_equal(y_filtered.shape, (291, 13))
         tc.assert_isreal(y_filtered)
+
+
+class TestDelta(unittest.TestCase):
+    @staticmethod
+    def lfilter_delta(data, width, order, axis):
+        # Reference: The former implementation of delta.
+        half_length = 1 + width // 2
+        window = np.arange(half_length - 1., -half_length, -1.)
+        window /= np.sum(np.abs(window)**2)
+        padding = [(0, 0)] * data.ndim
+        padding[axis] = (width, width)
+        delta_x = np.pad(data, padding, mode='edge')
+        for _ in range(order):
+            delta_x = scipy.signal.lfilter(window, 1, delta_x, axis=axis)
+        index = [slice(None)] * delta_x.ndim
+        index[axis] = slice(-half_length - data.shape[axis], -half_length)
+        return delta_x[tuple(index)]
+
+    def test_delta_equals_lfilter(self):
+        for width in [3, 9]:
+            for frames in [1, 2, 5, 50]:
+                x = np.random.normal(size=(2, frames, 3)) + 5
+                for axis in [0, 1, 2]:
+                    for order in [1, 2, 3]:
+                        tc.assert_allclose(
+                            transform.module_mfcc.delta(
+                                x, width=width, order=order, axis=axis),
+                            self.lfilter_delta(x, width, order, axis),
+                            atol=1e-12,
+                        )
+
+    def test_deltas(self):
+        x = np.random.normal(size=(2, 50, 13))
+        out = np.empty((3, 2, 50, 13))
+        d = transform.module_mfcc.deltas(x, order=3, axis=-2, out=out)
+        assert d is out
+        for order in [1, 2, 3]:
+            tc.assert_equal(
+                d[order - 1],
+                transform.module_mfcc.delta(x, order=order, axis=-2),
+            )
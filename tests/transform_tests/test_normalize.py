@@ -0,0 +1,96 @@
+import json
+import unittest
+
+import numpy as np
+
+from paderbox.transform import MeanVarianceNormalizer
+from paderbox.transform import normalize_mean_variance
+
+
+class TestMeanVarianceNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(
+            100, 3, size=(500, 4)).astype(np.float32)
+        # float32 statistics of normalize_mean_variance are less accurate.
+        self.reference = normalize_mean_variance(self.x.astype(np.float64))
+
+    def test_utterance(self):
+        normalizer = MeanVarianceNormalizer('utterance')
+        np.testing.assert_allclose(
+            normalizer(self.x), normalize_mean_variance(self.x), rtol=1e-6)
+
+    def test_global_equals_utterance(self):
+        normalizer = MeanVarianceNormalizer('global')
+        for chunk in np.array_split(self.x, [1, 7, 7, 100, 333]):
+            normalizer.update(chunk)
+        self.assertEqual(normalizer.count, 500)
+        np.testing.assert_allclose(
+            normalizer.mean, np.mean(self.x, axis=0, dtype=np.float64))
+        np.testing.assert_allclose(
+            normalizer.std, np.std(self.x, axis=0, dtype=np.float64))
+        np.testing.assert_allclose(
+            normalizer(self.x), self.reference,
+            rtol=1e-5, atol=1e-5,
+        )
+
+    def test_merge_and_serialize(self):
+        workers = [MeanVarianceNormalizer() for _ in range(3)]
+        for worker, chunk in zip(workers, np.array_split(self.x, 3)):
+            worker.update(chunk)
+        workers = [
+            MeanVarianceNormalizer.from_dict(json.loads(json.dumps(
+                worker.to_dict())))
+            for worker in workers
+        ]
+        merged = MeanVarianceNormalizer()
+        for worker in workers:
+            merged.merge(worker)
+        reference = MeanVarianceNormalizer()
+        reference.update(self.x)
+        self.assertEqual(merged.count, reference.count)
+        np.testing.assert_allclose(merged.mean, reference.mean)
+        np.testing.assert_allclose(merged.std, reference.std)
+
+    def test_inplace(self):
+        normalizer = MeanVarianceNormalizer()
+        normalizer.update(self.x)
+        reference = normalizer(self.x)
+        x = self.x.copy()
+        y = normalizer(x, out=x)
+        self.assertIs(y, x)
+        self.assertEqual(y.dtype, np.float32)
+        np.testing.assert_equal(y, reference)
+
+    def test_batch_axis(self):
+        x = self.x.reshape(5, 100, 4)
+        normalizer = MeanVarianceNormalizer(axis=(0, 1))
+        normalizer.update(x)
+        self.assertEqual(normalizer.mean.shape, (4,))
+        np.testing.assert_allclose(
+            normalizer(x).reshape(500, 4),
+            self.reference, rtol=1e-5, atol=1e-5,
+        )
+
+    def test_sliding(self):
+        window = 51
+        normalizer = MeanVarianceNormalizer('sliding', window=window)
+        y = normalizer(self.x)
+        for t in [0, 10, 25, 26, 250, 474, 475, 499]:
+            start = min(max(t - window // 2, 0), 500 - window)
+            segment = self.x[start:start + window].astype(np.float64)
+            np.testing.assert_allclose(
+                y[t],
+                (self.x[t] - segment.mean(0)) / (segment.std(0) + 1e-6),
+                rtol=1e-4, atol=1e-4,
+            )
+
+    def test_sliding_short_signal(self):
+        normalizer = MeanVarianceNormalizer('sliding', window=1000)
+        np.testing.assert_allclose(
+            normalizer(self.x), self.reference,
+            rtol=1e-5, atol=1e-5,
+        )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            MeanVarianceNormalizer('cepstral')
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+import paderbox.testing as tc
+from paderbox.transform.module_phase_features import get_phase_features
+from paderbox.transform.module_phase_features import transform_to_baseband
+
+
+class TestPhaseFeatures(unittest.TestCase):
+    def setUp(self):
+        shape = (20, 3, 33)
+        self.X = np.random.normal(size=shape) \
+            + 1j * np.random.normal(size=shape)
+
+    def test_transform_to_baseband(self):
+        size, shift = 64, 16
+        expected = self.X.copy()
+        for t in range(expected.shape[0]):
+            for f in range(expected.shape[-1]):
+                expected[t, :, f] *= np.exp(-2j * np.pi * t * f * shift / size)
+        tc.assert_allclose(
+            transform_to_baseband(self.X, size, shift), expected, atol=1e-12)
+
+    def test_transform_to_baseband_batch_and_inplace(self):
+        X = np.stack([self.X, 2 * self.X])
+        expected = transform_to_baseband(self.X, 64, 16)
+        tc.assert_allclose(
+            transform_to_baseband(X, 64, 16, time_axis=1),
+            np.stack([expected, 2 * expected]),
+        )
+        out = transform_to_baseband(X, 64, 16, time_axis=1, out=X)
+        assert out is X
+
+    def test_get_phase_features(self):
+        phase, delta, delta_delta = get_phase_features(self.X, 64, 16)
+        tc.assert_allclose(
+            phase, np.angle(transform_to_baseband(self.X, 64, 16)))
+        tc.assert_equal(delta[0], 0)
+        tc.assert_allclose(
+            np.exp(1j * delta[1:]), np.exp(1j * (phase[1:] - phase[:-1])),
+            atol=1e-12,
+        )
+        assert np.all(np.abs(delta) <= np.pi)
+        tc.assert_equal(delta_delta[1:], delta[1:] - delta[:-1])
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from paderbox.transform import STFT
+from paderbox.transform.module_phase_reconstruction import griffin_lim
+
+
+def spectral_convergence(x, stft, time_signal):
+    return (
+        np.linalg.norm(np.abs(stft(time_signal)) - x)
+        / np.linalg.norm(x)
+    )
+
+
+class TestGriffinLim(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.time_signal = (
+            np.sin(0.05 * np.arange(8000)) * np.cumsum(rng.randn(8000)) / 50
+        )
+
+    def classic_griffin_lim(self, x, stft, iterations):
+        """The textbook implementation with the offline STFT."""
+        audio = np.random.randn(int(stft.frames_to_samples(x.shape[-2])))
+        for _ in range(iterations):
+            angle = np.angle(stft(audio))
+            audio = stft.inverse(x * np.exp(1j * angle))
+        return audio
+
+    def test_classic(self):
+        for kwargs in [
+            dict(fading='full'),
+            dict(fading='half'),
+            dict(fading=False),
+            dict(window_length=400),
+        ]:
+            with self.subTest(**kwargs):
+                stft = STFT(160, 512, **kwargs)
+                x = np.abs(stft(self.time_signal))
+                np.random.seed(0)
+                reference = self.classic_griffin_lim(x, stft, 5)
+                np.random.seed(0)
+                # The default is the classic algorithm.
+                np.testing.assert_allclose(
+                    griffin_lim(x, stft, 5), reference, atol=1e-10,
+                )
+
+    def test_fast_converges_faster(self):
+        stft = STFT(160, 512)
+        x = np.abs(stft(self.time_signal))
+        np.random.seed(0)
+        classic = griffin_lim(x, stft, 20)
+        np.random.seed(0)
+        fast = griffin_lim(x, stft, 20, momentum=0.99)
+        self.assertLess(
+            spectral_convergence(x, stft, fast),
+            spectral_convergence(x, stft, classic),
+        )
+
+    def test_batch(self):
+        stft = STFT(160, 512, dtype=np.float32)
+        x = np.abs(stft(np.stack([
+            self.time_signal, self.time_signal[::-1], self.time_signal * 2,
+        ])))
+        reconstruction = griffin_lim(x.reshape(3, 1, *x.shape[-2:]), stft, 30)
+        self.assertEqual(reconstruction.shape, (3, 1, 8128))
+        self.assertEqual(reconstruction.dtype, np.float32)
+        for i in range(3):
+            self.assertLess(
+                spectral_convergence(x[i], stft, reconstruction[i, 0]), 0.2)
+
+    def test_early_stop(self):
+        stft = STFT(160, 512)
+        x = np.abs(stft(self.time_signal))
+        np.random.seed(0)
+        reference = griffin_lim(x, stft, 2)
+        # Any improvement is below the tolerance, hence the iterations stop
+        # after the second iteration.
+        np.random.seed(0)
+        np.testing.assert_equal(
+            griffin_lim(x, stft, 100, tolerance=np.inf), reference)
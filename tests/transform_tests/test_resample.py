@@ -0,0 +1,58 @@
+import shutil
+import unittest
+
+import numpy as np
+
+import paderbox.testing as tc
+from paderbox.transform import module_resample
+from paderbox.transform.module_resample import resample_polyphase
+from paderbox.transform.module_resample import resample_sox
+from paderbox.transform.module_resample import _get_resample_filter
+
+
+class TestResamplePolyphase(unittest.TestCase):
+    def test_shape_and_dtype(self):
+        for dtype in [np.float32, np.float64]:
+            x = np.random.normal(size=(2, 3, 1000)).astype(dtype)
+            y = resample_polyphase(x, in_rate=16000, out_rate=8000)
+            tc.assert_equal(y.shape, (2, 3, 500))
+            tc.assert_equal(y.dtype, dtype)
+            y = resample_polyphase(x, in_rate=44100, out_rate=16000)
+            tc.assert_equal(y.shape, (2, 3, 363))
+
+    def test_axis(self):
+        x = np.random.normal(size=(3, 1000))
+        tc.assert_allclose(
+            resample_polyphase(x.T, in_rate=3, out_rate=2, axis=0).T,
+            resample_polyphase(x, in_rate=3, out_rate=2),
+        )
+
+    def test_filter_cache(self):
+        h = _get_resample_filter(1, 3, 'sox')
+        assert _get_resample_filter(1, 3, 'sox') is h
+        assert not h.flags.writeable
+
+    def test_default_is_sox(self):
+        # resample_polyphase is an alternative engine, not the default.
+        assert module_resample.resample is resample_sox
+
+    def test_unknown_quality(self):
+        with self.assertRaises(ValueError):
+            resample_polyphase(np.zeros(10), in_rate=2, out_rate=1,
+                               quality='best')
+
+    @unittest.skipIf(shutil.which('sox') is None, 'sox is not installed')
+    def test_close_to_sox(self):
+        # Tones in the passband of both filters. The edges are excluded,
+        # because the transients depend on the filter length.
+        t = np.arange(16000)
+        x = sum(
+            0.2 * np.sin(2 * np.pi * f * t / 16000)
+            for f in [440, 1000, 3000]
+        ).astype(np.float32)
+        for in_rate, out_rate in [(16000, 8000), (8000, 16000)]:
+            expected = resample_sox(x, in_rate=in_rate, out_rate=out_rate)
+            actual = resample_polyphase(x, in_rate=in_rate, out_rate=out_rate)
+            tc.assert_equal(actual.shape, expected.shape)
+            tc.assert_allclose(
+                actual[500:-500], expected[500:-500], atol=2e-3)
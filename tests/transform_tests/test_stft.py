@@ -354,3 +354,294 @@ class TestSTFTModule(unittest.TestCase):
 
     def test_against_scipy_with_fixed_parameters(self):
         pass
+
+    def test_chunked_stft(self):
+        x = np.random.normal(size=(2, 3, 5000))
+        for axis in [0, 1, 2]:
+            x_ = np.moveaxis(x, -1, axis)
+            for chunk_size in [1, 7, 1000]:
+                tc.assert_equal(
+                    stft(x_, 512, 128, axis=axis, chunk_size=chunk_size),
+                    stft(x_, 512, 128, axis=axis),
+                )
+
+    def test_chunked_spectrogram(self):
+        from paderbox.transform.module_stft import spectrogram
+        x = np.random.normal(size=(2, 3, 5000))
+        for axis in [0, 1, 2]:
+            x_ = np.moveaxis(x, -1, axis)
+            for chunk_size in [1, 7, 1000]:
+                tc.assert_equal(
+                    spectrogram(
+                        x_, 512, 128, axis=axis, chunk_size=chunk_size),
+                    stft_to_spectrogram(stft(x_, 512, 128, axis=axis)),
+                )
+        power = spectrogram(x, 512, 128, chunk_size=7, dtype=np.float32)
+        tc.assert_equal(power.dtype, np.float32)
+        tc.assert_equal(
+            spectrogram(x, 512, 128, chunk_size=7, transform=np.log),
+            np.log(spectrogram(x, 512, 128)),
+        )
+
+    def test_stft_from_file(self):
+        import tempfile
+        from pathlib import Path
+        from paderbox.io import dump_audio, load_audio
+        from paderbox.transform.module_stft import STFT, stft_from_file
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'audio.wav'
+            dump_audio(np.random.uniform(-0.5, 0.5, size=(2, 5000)), path)
+            for fading in ['full', 'half', False]:
+                for pad in [True, False]:
+                    stft_ = STFT(160, 512, 400, fading=fading, pad=pad)
+                    X = stft_(load_audio(path))
+                    frames = X.shape[-2]
+                    for start, stop in [
+                        (0, 1), (0, frames), (5, 12), (frames - 3, frames),
+                        (7, 7),
+                    ]:
+                        tc.assert_equal(
+                            stft_from_file(path, stft_, (start, stop)),
+                            X[..., start:stop, :],
+                        )
+
+            # A complex dtype is equivalent to the real dtype.
+            for dtype in [np.float32, np.complex64]:
+                stft_ = STFT(160, 512, 400, dtype=dtype)
+                X = stft_(load_audio(path))
+                actual = stft_from_file(path, stft_, (5, 12))
+                tc.assert_equal(actual.dtype, np.complex64)
+                tc.assert_equal(actual, X[..., 5:12, :])
+
+    def test_overlap_add_equals_add_at(self):
+        from paderbox.array import segment_axis
+        from paderbox.transform.module_stft import _overlap_add
+        for window_length, shift in [(512, 128), (400, 160), (16, 3)]:
+            frames = np.random.normal(size=(2, 3, 20, window_length))
+            reference = np.zeros((2, 3, 19 * shift + window_length))
+            np.add.at(
+                segment_axis(reference, window_length, shift, end=None),
+                ...,
+                frames,
+            )
+            tc.assert_equal(_overlap_add(frames, shift), reference)
+
+    def test_stft_object_caches_windows(self):
+        from paderbox.transform.module_stft import STFT
+        stft_ = STFT(128, 512, window_length=400, window='hann')
+        x = np.random.normal(size=(2, 3000))
+        X = stft_(x)
+        tc.assert_equal(
+            X, stft(x, 512, 128, window_length=400, window='hann'))
+        tc.assert_equal(
+            stft_.inverse(X),
+            istft(X, 512, 128, window_length=400, window='hann'),
+        )
+        assert stft_.analysis_window is stft_.analysis_window
+        assert stft_.synthesis_window is stft_.synthesis_window
+        tc.assert_equal(
+            stft_._get_window(dtype=np.float32).dtype, np.float32)
+
+    def test_stft_object_array_window(self):
+        from paderbox.transform.module_stft import STFT
+        window = np.hanning(400)
+        stft_ = STFT(128, 512, window_length=400, window=window)
+        x = np.random.normal(size=(2, 3000))
+        X = stft_(x)
+        tc.assert_equal(
+            X, stft(x, 512, 128, window_length=400, window=window))
+        tc.assert_equal(
+            stft_.inverse(X),
+            istft(X, 512, 128, window_length=400, window=window),
+        )
+
+    def test_window_lru_cache(self):
+        from paderbox.transform.module_stft import _get_window
+        from paderbox.transform.module_stft import _get_synthesis_window
+        assert _get_window('hann', False, 512) \
+            is _get_window('hann', False, 512)
+        synthesis_window = _get_synthesis_window('hann', False, 512, 128)
+        assert synthesis_window \
+            is _get_synthesis_window('hann', False, 512, 128)
+        tc.assert_equal(
+            synthesis_window,
+            _biorthogonal_window_fastest(_get_window('hann', False, 512), 128)
+        )
+        assert not synthesis_window.flags.writeable
+
+    def test_single_precision(self):
+        x = np.random.normal(size=(2, 5000))
+        X = stft(x, 512, 128)
+        for fft_backend in ['numpy', 'scipy']:
+            X32 = stft(x, 512, 128, dtype=np.float32, fft_backend=fft_backend)
+            tc.assert_equal(X32.dtype, np.complex64)
+            tc.assert_allclose(X32, X, atol=1e-5 * np.abs(X).max())
+
+            x32 = istft(X32, 512, 128, dtype=np.float32,
+                        fft_backend=fft_backend, num_samples=x.shape[-1])
+            tc.assert_equal(x32.dtype, np.float32)
+            tc.assert_allclose(x32, x, atol=1e-5 * np.abs(x).max())
+
+    def test_batch_stft(self):
+        from paderbox.transform.module_stft import batch_stft
+        time_signals = [
+            np.random.normal(size=(2, num_samples))
+            for num_samples in [1000, 513, 2000, 777]
+        ]
+        for fading in ['full', 'half', False]:
+            for pad in [True, False]:
+                kwargs = dict(
+                    size=512, shift=160, window_length=400,
+                    fading=fading, pad=pad,
+                )
+                stft_signal, frames = batch_stft(time_signals, **kwargs)
+                stft_list = batch_stft(
+                    time_signals, return_list=True, **kwargs)
+                for time_signal, stft_item, frames_item, list_item in zip(
+                        time_signals, stft_signal, frames, stft_list
+                ):
+                    reference = stft(time_signal, **kwargs)
+                    tc.assert_equal(reference.shape[-2], frames_item)
+                    tc.assert_equal(stft_item[..., :frames_item, :], reference)
+                    tc.assert_equal(list_item, reference)
+
+    def test_batch_stft_short_signal(self):
+        # Signals shorter than one window
+        from paderbox.transform.module_stft import batch_stft
+        time_signals = [
+            np.random.normal(size=(2, num_samples))
+            for num_samples in [1000, 100]
+        ]
+        kwargs = dict(size=512, shift=128, fading=False)
+
+        stft_signal, frames = batch_stft(time_signals, pad=True, **kwargs)
+        stft_list = batch_stft(
+            time_signals, pad=True, return_list=True, **kwargs)
+        tc.assert_equal(frames, [5, 1])
+        for time_signal, stft_item, frames_item, list_item in zip(
+                time_signals, stft_signal, frames, stft_list
+        ):
+            reference = stft(time_signal, pad=True, **kwargs)
+            tc.assert_equal(stft_item[..., :frames_item, :], reference)
+            tc.assert_equal(list_item, reference)
+
+        # Without padding, the short signal has no frame.
+        stft_signal, frames = batch_stft(time_signals, pad=False, **kwargs)
+        stft_list = batch_stft(
+            time_signals, pad=False, return_list=True, **kwargs)
+        tc.assert_equal(frames, [4, 0])
+        tc.assert_equal(
+            stft_list[0], stft(time_signals[0], pad=False, **kwargs))
+        tc.assert_equal(stft_list[1].shape, (2, 0, 257))
+
+    def test_multi_resolution_stft(self):
+        from paderbox.transform.module_stft import STFT
+        from paderbox.transform.module_stft import MultiResolutionSTFT
+        x = np.random.normal(size=(2, 5000))
+        for fading in ['full', 'half', False]:
+            stfts = {
+                'a': STFT(120, 1024, 600, fading=fading),
+                'b': STFT(240, 2048, 1200, fading=fading),
+                'c': STFT(50, 512, 240, fading=fading),
+                'd': STFT(50, 256, 240, fading=fading, pad=False),
+            }
+            stft_signals = MultiResolutionSTFT(stfts)(x)
+            tc.assert_equal(sorted(stft_signals.keys()), ['a', 'b', 'c', 'd'])
+            for key, stft_ in stfts.items():
+                tc.assert_equal(stft_signals[key], stft_(x))
+
+    def test_multi_resolution_stft_shared_segments(self):
+        from paderbox.transform.module_stft import STFT
+        from paderbox.transform.module_stft import MultiResolutionSTFT
+        for num_samples in [5000, 5100, 700]:
+            x = np.random.normal(size=(2, num_samples))
+            stfts = {
+                'a': STFT(128, 512, fading='full'),
+                'b': STFT(256, 512, fading='full'),
+                'c': STFT(256, 1024, 512, fading='full'),
+                'd': STFT(384, 512, fading=False),
+                'e': STFT(200, 512, fading=False),
+                'f': STFT(128, 512, fading=False, pad=False),
+            }
+            mr_stft = MultiResolutionSTFT(stfts)
+            stft_signals = mr_stft(x)
+            for key, stft_ in stfts.items():
+                tc.assert_equal(stft_signals[key], stft_(x))
+
+            # Shift 256 frames with fading='full' are every second frame of
+            # shift 128 frames, starting at the second frame. Without fading,
+            # shift 384 frames are every third frame, starting at the fourth
+            # frame.
+            segments = mr_stft._segments(x, mr_stft._shared_keys())
+            tc.assert_equal(segments['b'].base is segments['a'], True)
+            tc.assert_equal(segments['c'].base is segments['a'], True)
+            tc.assert_equal(segments['d'].base is segments['a'], True)
+            tc.assert_equal(segments['e'].base is segments['a'], False)
+
+        # Different window lengths: Nothing to share, hence no shared buffer.
+        mr_stft = MultiResolutionSTFT([
+            STFT(120, 1024, 600), STFT(240, 2048, 1200), STFT(50, 512, 240),
+        ])
+        tc.assert_equal(mr_stft._shared_keys(), [])
+
+    def test_vectorized_sample_frame_conversions(self):
+        from paderbox.transform.module_stft import \
+            sample_index_to_stft_frame_index
+        samples = np.arange(-100, 2000)
+        for window_length, shift in [(16, 4), (16, 3), (7, 2), (400, 160)]:
+            for fading in [None, False, 'full', 'half']:
+                for pad in [True, False]:
+                    tc.assert_equal(
+                        _samples_to_stft_frames(
+                            samples, window_length, shift,
+                            pad=pad, fading=fading,
+                        ),
+                        [_samples_to_stft_frames(
+                            int(s), window_length, shift,
+                            pad=pad, fading=fading,
+                        ) for s in samples],
+                    )
+                tc.assert_equal(
+                    _stft_frames_to_samples(
+                        samples, window_length, shift, fading=fading),
+                    [_stft_frames_to_samples(
+                        int(s), window_length, shift, fading=fading,
+                    ) for s in samples],
+                )
+                tc.assert_equal(
+                    sample_index_to_stft_frame_index(
+                        samples[100:], window_length, shift, fading=fading),
+                    [sample_index_to_stft_frame_index(
+                        int(s), window_length, shift, fading=fading,
+                    ) for s in samples[100:]],
+                )
+
+    def test_intervall_conversions(self):
+        from paderbox.array.intervall import ArrayIntervall
+        from paderbox.transform.module_stft import STFT
+        for kwargs in [
+            dict(), dict(fading='half'), dict(fading=False),
+            dict(window_length=400), dict(fading=False, pad=False),
+        ]:
+            stft_ = STFT(160, 512, **kwargs)
+            for string in [
+                '0:0', '0:16000', '15999:16000', '100:101, 200:201',
+                '0:1600, 3200:8000, 15990:16000',
+            ]:
+                samples = ArrayIntervall.from_str(string, shape=16000)
+                frames = stft_.sample_intervall_to_frame_intervall(samples)
+
+                # Brute force: Each sample activates its best frame.
+                best_frame = np.minimum(
+                    stft_.sample_index_to_frame_index(np.arange(16000)),
+                    frames.shape[-1] - 1,
+                )
+                reference = np.zeros(frames.shape, dtype=bool)
+                reference[best_frame[samples[:]]] = True
+                tc.assert_equal(frames[:], reference)
+
+                tc.assert_equal(
+                    stft_.frame_intervall_to_sample_intervall(
+                        frames, num_samples=16000)[:],
+                    reference[best_frame],
+                )
@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+import paderbox.testing as tc
+from paderbox.transform.module_stft import STFT
+from paderbox.transform.module_streaming import StreamingSTFT
+from paderbox.transform.module_streaming import StreamingISTFT
+
+
+def _split(x, block_sizes, axis=-1):
+    boundaries = np.cumsum(block_sizes)
+    boundaries = boundaries[boundaries < x.shape[axis]]
+    return np.split(x, boundaries, axis=axis)
+
+
+class TestStreamingSTFT(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.RandomState(0).normal(size=(3, 8000))
+
+    def check_stft(self, stft, block_sizes):
+        streaming_stft = StreamingSTFT(stft)
+        X = np.concatenate(
+            [streaming_stft(block) for block in _split(self.x, block_sizes)]
+            + [streaming_stft.flush()],
+            axis=-2
+        )
+        tc.assert_equal(X, stft(self.x))
+
+    def check_istft(self, stft, block_sizes):
+        X = stft(self.x)
+        streaming_istft = StreamingISTFT(stft)
+        x = np.concatenate(
+            [streaming_istft(block) for block in _split(X, block_sizes, -2)]
+            + [streaming_istft.flush()],
+            axis=-1
+        )
+        tc.assert_equal(x, stft.inverse(X))
+
+    def test_stft_without_fading(self):
+        stft = STFT(shift=256, size=1024, fading=False)
+        self.check_stft(stft, [100] * 80)
+        self.check_stft(stft, [1000, 1, 1, 5000])
+
+    def test_stft_with_fading(self):
+        for fading in ['full', 'half']:
+            for pad in [True, False]:
+                stft = STFT(shift=160, size=512, window_length=400,
+                            fading=fading, pad=pad)
+                self.check_stft(stft, [160] * 50)
+                self.check_stft(stft, [7, 3000, 333])
+
+    def test_istft(self):
+        for fading in [False, 'full', 'half']:
+            stft = STFT(shift=160, size=512, window_length=400, fading=fading)
+            self.check_istft(stft, [1] * 60)
+            self.check_istft(stft, [0, 7, 10, 3])
+
+    def test_reset_after_flush(self):
+        stft = STFT(shift=256, size=1024)
+        streaming_stft = StreamingSTFT(stft)
+        for _ in range(2):
+            X = np.concatenate(
+                [streaming_stft(self.x), streaming_stft.flush()], axis=-2)
+            tc.assert_equal(X, stft(self.x))
+
+    def test_flush_without_input(self):
+        stft = STFT(shift=256, size=1024, dtype=np.float32)
+        streaming_stft = StreamingSTFT(stft)
+        streaming_istft = StreamingISTFT(stft)
+        tc.assert_equal(streaming_stft.flush().shape, (0, 513))
+        tc.assert_equal(streaming_istft.flush().shape, (0,))
+
+        X = streaming_stft(self.x)
+        X = np.concatenate([X, streaming_stft.flush()], axis=-2)
+        x = np.concatenate(
+            [streaming_istft(X), streaming_istft.flush()], axis=-1)
+        # Nothing was fed after the flush, the batch shape is kept.
+        empty = streaming_stft.flush()
+        tc.assert_equal(empty.shape, (3, 0, 513))
+        tc.assert_equal(empty.dtype, np.complex64)
+        empty = streaming_istft.flush()
+        tc.assert_equal(empty.shape, (3, 0))
+        tc.assert_equal(empty.dtype, np.float32)
+        tc.assert_equal(np.concatenate([x, empty], axis=-1), x)
@@ -0,0 +1,237 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from paderbox.array.intervall import ArrayIntervall
+from paderbox.array.intervall import overlap_count
+from paderbox.array.intervall import zeros
+from paderbox.array.intervall import util_numpy
+
+
+class TestArrayIntervall(unittest.TestCase):
+    def test_random_operations(self):
+        """Compare with a boolean numpy array."""
+        rng = np.random.RandomState(0)
+        for _ in range(200):
+            size = rng.randint(1, 200)
+            ai = zeros(size)
+            reference = np.zeros(size, dtype=bool)
+            for _ in range(rng.randint(1, 30)):
+                start = rng.randint(0, size + 1)
+                stop = rng.randint(start, size + 1)
+                operation = rng.randint(4)
+                if operation < 2:
+                    value = 1
+                elif operation == 2:
+                    value = 0
+                elif stop > start:
+                    value = rng.rand(stop - start) < 0.5
+                else:
+                    continue
+                ai[start:stop] = value
+                reference[start:stop] = value
+
+                start = rng.randint(0, size + 1)
+                stop = rng.randint(start, size + 1)
+                np.testing.assert_equal(
+                    ai[start:stop], reference[start:stop])
+
+            np.testing.assert_equal(ai[:], reference)
+            self.assertEqual(repr(ai), repr(ArrayIntervall(reference)))
+
+    def test_remove_from_interval_start(self):
+        ai = zeros(50)
+        ai[10:30] = 1
+        ai[10:20] = 0
+        self.assertEqual(repr(ai), 'ArrayIntervall("20:30", shape=(50,))')
+
+    def test_normalized_storage(self):
+        ai = zeros(100)
+        for start, stop in [(50, 60), (0, 10), (5, 20), (20, 25), (70, 70)]:
+            ai[start:stop] = 1
+        self.assertEqual(ai.intervals, ((0, 25), (50, 60)))
+        self.assertIsInstance(ai.intervals[0][0], int)
+        np.testing.assert_equal(ai.normalized_array, [[0, 25], [50, 60]])
+        self.assertEqual(ai.normalized_array.dtype, np.int64)
+
+    def test_large_values(self):
+        ai = zeros()
+        ai.add_intervals(np.array([[2**40, 2**40 + 10], [5, 7]]))
+        self.assertEqual(ai.intervals, ((5, 7), (2**40, 2**40 + 10)))
+
+    def test_many_intervals(self):
+        starts = np.arange(0, 10 ** 6, 10)
+        ai = zeros(10 ** 6)
+        for start in starts.tolist():
+            ai[start:start + 5] = 1
+        ai[5:20] = 1
+        np.testing.assert_equal(
+            ai.normalized_array[:3], [[0, 25], [30, 35], [40, 45]])
+        self.assertEqual(len(ai.intervals), len(starts) - 2)
+
+    def test_or(self):
+        a = ArrayIntervall.from_str('0:10, 20:30', shape=50)
+        b = ArrayIntervall.from_str('5:25, 40:50', shape=50)
+        self.assertEqual(
+            repr(a | b), 'ArrayIntervall("0:30, 40:50", shape=(50,))')
+
+    def test_pickle(self):
+        ai = ArrayIntervall.from_str('1:4, 5:20, 21:25', shape=50)
+        ai[30:40] = 1
+        self.assertEqual(repr(pickle.loads(pickle.dumps(ai))), repr(ai))
+
+    def test_from_mask(self):
+        rng = np.random.RandomState(1)
+        for shape in [(0,), (1,), (7,), (3, 0), (0, 5), (5, 1), (6, 50)]:
+            mask = rng.rand(*shape) < 0.5
+            ais = ArrayIntervall.from_mask(mask)
+            if mask.ndim == 1:
+                ais = [ais]
+                mask = [mask]
+            self.assertEqual(len(ais), len(mask))
+            for ai, row in zip(ais, mask):
+                self.assertEqual(ai.shape, row.shape)
+                np.testing.assert_equal(ai[:], row)
+                self.assertEqual(repr(ai), repr(ArrayIntervall(row)))
+
+    def test_from_edges(self):
+        rng = np.random.RandomState(2)
+        starts = rng.randint(0, 1000, size=100)
+        stops = starts + rng.randint(0, 20, size=100)
+        ai = ArrayIntervall.from_edges(starts, stops, shape=1020)
+        reference = zeros(1020)
+        for start, stop in zip(starts, stops):
+            reference[start:stop] = 1
+        self.assertEqual(repr(ai), repr(reference))
+        with self.assertRaises(AssertionError):
+            ArrayIntervall.from_edges([0], [30], shape=20)
+
+    def test_set_operations(self):
+        rng = np.random.RandomState(3)
+        for size in [1, 2, 10, 100]:
+            for _ in range(20):
+                a = rng.rand(size) < rng.rand()
+                b = rng.rand(size) < rng.rand()
+                ai_a = ArrayIntervall(a)
+                ai_b = ArrayIntervall(b)
+                for result, reference in [
+                    (ai_a | ai_b, a | b),
+                    (ai_a & ai_b, a & b),
+                    (ai_a - ai_b, a & ~b),
+                    (ai_a ^ ai_b, a ^ b),
+                    (~ai_a, ~a),
+                ]:
+                    self.assertEqual(repr(result), repr(ArrayIntervall(
+                        reference)))
+                self.assertEqual(ai_a.sum(), np.sum(a))
+                self.assertEqual(ai_a.count_nonzero(), np.count_nonzero(a))
+
+    def test_invert_unknown_shape(self):
+        with self.assertRaises(RuntimeError):
+            ~zeros()
+
+    def test_overlap_count(self):
+        rng = np.random.RandomState(4)
+        masks = rng.rand(5, 200) < 0.3
+        counts = overlap_count(ArrayIntervall.from_mask(masks))
+        dense = np.zeros(200, dtype=np.int64)
+        for start, stop, count in counts:
+            self.assertTrue(count > 0)
+            dense[start:stop] = count
+        np.testing.assert_equal(dense, np.sum(masks, axis=0))
+        # Neighbouring segments have different counts.
+        touching = counts[1:, 0] == counts[:-1, 1]
+        self.assertTrue(np.all(
+            counts[1:, 2][touching] != counts[:-1, 2][touching]))
+
+        self.assertEqual(overlap_count([]).shape, (0, 3))
+        self.assertEqual(overlap_count([zeros(10)]).shape, (0, 3))
+
+    def test_fancy_indexing(self):
+        rng = np.random.RandomState(5)
+        mask = rng.rand(300) < 0.5
+        ai = ArrayIntervall(mask)
+        index = rng.randint(-300, 300, size=(4, 50))
+        np.testing.assert_equal(ai[index], mask[index])
+        np.testing.assert_equal(ai[list(index[0])], mask[index[0]])
+        selection = rng.rand(300) < 0.5
+        np.testing.assert_equal(ai[selection], mask[selection])
+        for i in [0, 17, 299, -1]:
+            self.assertEqual(ai[i], mask[i])
+        with self.assertRaises(IndexError):
+            ai[300]
+        with self.assertRaises(IndexError):
+            ai[np.array([0, -301])]
+        with self.assertRaises(IndexError):
+            ai[1.5]
+
+    def test_query_ranges(self):
+        rng = np.random.RandomState(6)
+        mask = rng.rand(300) < 0.5
+        ai = ArrayIntervall(mask)
+        starts = rng.randint(0, 300, size=100)
+        stops = np.minimum(starts + rng.randint(0, 40, size=100), 300)
+        count = [np.sum(mask[s:e]) for s, e in zip(starts, stops)]
+        np.testing.assert_equal(
+            ai.query_ranges(starts, stops, output='count'), count)
+        coverage = ai.query_ranges(starts, stops)
+        nonempty = stops > starts
+        np.testing.assert_allclose(
+            coverage[nonempty],
+            np.array(count)[nonempty] / (stops - starts)[nonempty],
+        )
+
+        starts = np.arange(0, 280, 7)
+        np.testing.assert_equal(
+            ai.query_ranges(starts, starts + 20, output='mask'),
+            np.array([mask[s:s + 20] for s in starts]),
+        )
+        np.testing.assert_equal(
+            zeros(10).query_ranges([0, 5], [10, 7], output='count'), [0, 0])
+        with self.assertRaises(ValueError):
+            ai.query_ranges([0], [1], output='dense')
+
+
+class TestIntervallUtil(unittest.TestCase):
+    def setUp(self):
+        try:
+            from paderbox.array.intervall import util
+        except ImportError:
+            raise unittest.SkipTest('Cython extension is not compiled.')
+        self.util = util
+
+    def test_kernels_match_numpy_fallback(self):
+        rng = np.random.RandomState(7)
+        for offset in [0, 2**40]:
+            for _ in range(500):
+                intervals = rng.randint(0, 50, size=(rng.randint(0, 8), 2))
+                intervals += offset
+                interval = tuple(int(v) for v in rng.randint(0, 50, 2) + offset)
+                for name in ['cy_intersection', 'cy_non_intersection']:
+                    expected = getattr(util_numpy, name)(interval, intervals)
+                    actual = getattr(self.util, name)(interval, intervals)
+                    self.assertEqual(actual.dtype, np.int64)
+                    np.testing.assert_equal(actual, expected)
+
+    def test_non_intersection(self):
+        intervals = np.array([[0, 10], [12, 20], [30, 40]])
+        for module in [self.util, util_numpy]:
+            np.testing.assert_equal(
+                module.cy_non_intersection((5, 35), intervals),
+                [[0, 5], [35, 40]],
+            )
+            np.testing.assert_equal(
+                module.cy_non_intersection((5, 5), intervals), intervals)
+
+    def test_str_to_intervalls(self):
+        string = f'1:4, 5:20, {2**40}:{2**41},'
+        for module in [self.util, util_numpy]:
+            np.testing.assert_equal(
+                module.cy_str_to_intervalls(string),
+                [[1, 4], [5, 20], [2**40, 2**41]],
+            )
+            self.assertEqual(
+                module.cy_parse_item(slice(None, None), (2**40,)),
+                (0, 2**40),
+            )